@@ -4,42 +4,116 @@
 
 __author__ = "Adam Karl"
 
-import timeit, array, os, numpy as np
+import timeit, array, os, sys, io, json, time, platform, hashlib, subprocess, contextlib, multiprocessing, collections, numpy as np
+from http.server import HTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
 from numpy import uint8, uint16, dtype
 
+if os.name == 'nt':
+    import msvcrt
+else:
+    import fcntl
+
 ALL_WORDS_FILE = '.\input\wordle-words-adjusted.txt'
 SOLUTION_WORDS_FILE = '.\input\wordle-solutions.txt'
 
 FIRST_GUESS = 'roate'
 
 GUESS_ESTIMATION_ARRAY = '.\output\output_guess_estimation.txt'
+GUESS_ESTIMATION_STORE_FILE = '.\output\output_guess_estimation.bin'
 PATTERN_MATRIX_FILE = '.\output\output_pattern_matrix.txt'
 PATTERN_FREQ_MATRIX_FILE = '.\output\output_pattern_freq_matrix.txt'
+PATTERN_MATRIX_BIN_FILE = '.\output\output_pattern_matrix.bin'
+PATTERN_FREQ_MATRIX_BIN_FILE = '.\output\output_pattern_freq_matrix.bin'
 OUTPUT_FILE = '.\output\output_solution.txt'
+STRATEGY_TREE_FILE = '.\output\output_strategy_tree.txt'
+OPENER_CHECKPOINT_FILE = '.\output\output_opener_checkpoint.txt'
+OPTIMAL_CHECKPOINT_FILE = '.\output\output_optimal_checkpoint.txt'
+BENCHMARK_FILE = '.\output\output_benchmark.json'
+
+PATTERN_BLOCK_SIZE = 256 # max number of guess rows computed at once when generating the pattern matrix
+PATTERN_MEMORY_BUDGET = 256 * 2**20 # bytes of scratch memory a block of pattern rows may use while being generated
+TEXT_MATRIX_CHECK_ROWS = 64 # rows of an old text matrix recomputed to check it before it is converted to the binary format
+
+ANALYSIS_CHUNK_SIZE = 1024 # max number of guess rows processed at once during freq matrix and first guess analysis
+
+GUESS_HEURISTIC = 'avgBucketSize' # how chooseGuess scores guesses, one of the GUESS_HEURISTICS names
+MAX_GUESSES = 6 # games needing more guesses than this count as failures
+
+OPTIMAL_TOP_K = 10 # number of candidate guesses the exact solver tries at each node
+OPTIMAL_PROGRESS_INTERVAL = 1000 # print a progress line every this many solver nodes
+USELESS_GUESS_BOUND = 2**40
+
+SERVER_PORT = 8765 # localhost port used by serveSolverHttp
+LATENCY_WINDOW = 10000 # number of recent query latencies kept for the p50/p99 counters
+BENCHMARK_SET_SIZES = [10, 50, 200, 1000, 2309] # candidate set sizes timed for a single makeBestGuess call
+
+GUESS_ESTIMATION_CHECKPOINT_INTERVAL = 250 # main() merges its guess estimation evidence into the file every this many answers
+
+OPENER_TOP_PAIRS = 20 # number of ranked openers the two step opener search keeps
+OPENER_BATCH_SIZE = 32 # first guesses searched between checkpoints of the two step opener search
+OPENER_PRUNE_STAGES = 10 # the fixed opener search prunes second guesses after each of this many equal shares of the answers
+
+MULTI_BOARD_SAMPLES = 1000 # number of random answer tuples multiBoardMain plays
+MULTI_BOARD_GUESS_LIMITS = {2: 7, 4: 9, 8: 13} # guesses allowed in Dordle, Quordle and Octordle
+
+MASK_CACHE_ROWS = 4096 # number of guess rows whose per pattern bitsets are kept in memory
+
+GUESS_CACHE_SIZE = 100000 # max number of candidate sets the resident solver remembers a guess for
+GAME_LOG_PROGRESS_INTERVAL = 10000 # print throughput every this many games during evaluateGameLog
+
+NUM_WORKERS = os.cpu_count() or 1 # processes used by the parallel simulation and analysis
+
+MATRIX_FILE_MAGIC = b'WORDLEMX'
+MATRIX_FILE_ALIGNMENT = 64
         
 def loadWordList(file):
     f = open(file, 'r')
     wordList = f.readlines()
     f.close()
 
-    for i in range(len(wordList)): #trim whitespace
-        wordList[i] = wordList[i][:5]
-    return wordList
+    #trim whitespace, words can be any (consistent) length
+    return [word.strip().lower() for word in wordList if word.strip()]
 
 def makePatternMatrix(solutionWordList, guessesWordList):
-    """If the pattern matrix exists as a file, import it. Otherwise, generate one and save it to file"""
-    if os.path.exists(PATTERN_MATRIX_FILE):
-        return importPatternMatrix()
+    """If the binary pattern matrix exists and matches the word lists, memory map it.
+    If only the old text file exists and a sample of its rows match freshly computed ones,
+    import it once and convert it to the binary format. Otherwise, generate one and save it to file"""
+    fingerprint = wordListFingerprint(solutionWordList, guessesWordList)
+    shape = (len(guessesWordList), len(solutionWordList))
+    
+    if os.path.exists(PATTERN_MATRIX_BIN_FILE):
+        patternMatrix = importMatrixBinary(PATTERN_MATRIX_BIN_FILE, fingerprint)
+        if patternMatrix is not None:
+            return patternMatrix
+        print('Pattern matrix file is stale, rebuilding', flush=True)
+    elif os.path.exists(PATTERN_MATRIX_FILE):
+        patternMatrix = importPatternMatrix()
+        if patternMatrix.shape == shape and textPatternMatrixMatches(patternMatrix, solutionWordList, guessesWordList):
+            saveMatrixBinary(PATTERN_MATRIX_BIN_FILE, patternMatrix, fingerprint)
+            return importMatrixBinary(PATTERN_MATRIX_BIN_FILE, fingerprint)
+        print('Pattern matrix text file does not match the word lists, rebuilding', flush=True)
     return initializePatternMatrix(solutionWordList, guessesWordList)
 
+def sampleRowIndices(numRows, numSamples=TEXT_MATRIX_CHECK_ROWS, seed=0):
+    """Sorted indices of a random sample of rows that always includes the first and last row"""
+    rng = np.random.default_rng(seed)
+    sample = rng.choice(numRows, size=min(numSamples, numRows), replace=False)
+    return np.union1d(sample, [0, numRows - 1])
+
+def textPatternMatrixMatches(patternMatrix, solutionWordList, guessesWordList):
+    """Recompute a sample of rows of a pattern matrix imported from the old text file with
+    computePatternBlock, since the text file has no fingerprint to say which word lists it was built from"""
+    rows = sampleRowIndices(len(guessesWordList))
+    expected = computePatternBlock(encodeWords([guessesWordList[i] for i in rows]), encodeWords(solutionWordList))
+    return np.array_equal(patternMatrix[rows], expected)
+
 def importPatternMatrix():
-    print('Importing pattern matrix from file...', end='', flush=True)
+    """Import the old space separated text format of the pattern matrix"""
+    print('Importing pattern matrix from text file...', end='', flush=True)
     startTime = timeit.default_timer()
     
-    tmp = list()
-    with open(PATTERN_MATRIX_FILE) as file:
-        tmp = [[int(n) for n in line.split()] for line in file]
-    patternMatrix = np.array(tmp, uint8)
+    patternMatrix = importMatrixText(PATTERN_MATRIX_FILE, uint8)
     
     endTime = timeit.default_timer()
     elapsedTime = endTime - startTime
@@ -47,60 +121,234 @@ def importPatternMatrix():
     print(f'Imported a {patternMatrix.shape[0]} x {patternMatrix.shape[1]} matrix in {formatted_time} sec', flush=True)
     return patternMatrix
 
+def importMatrixText(file, matrixDtype):
+    """Parse a space separated text matrix straight into a numpy array"""
+    with open(file) as f:
+        numCols = len(f.readline().split())
+    values = np.fromfile(file, dtype=np.int64, sep=' ')
+    return values.astype(matrixDtype).reshape(-1, numCols)
+
+def wordListFingerprint(solutionWordList, guessesWordList):
+    """Hash both word lists (including their order) so a stale matrix file can be detected"""
+    h = hashlib.sha256()
+    h.update('\n'.join(solutionWordList).encode('ascii'))
+    h.update(b'\0')
+    h.update('\n'.join(guessesWordList).encode('ascii'))
+    return h.hexdigest()
+
+def matrixHeader(shape, matrixDtype, fingerprint):
+    """Magic, header length and json header (shape, dtype, word list fingerprint), padded so the
+    matrix data that follows is aligned for memory mapping"""
+    header = json.dumps({'shape': list(shape), 'dtype': np.dtype(matrixDtype).str, 'fingerprint': fingerprint}).encode('ascii')
+    headerLength = len(MATRIX_FILE_MAGIC) + 4 + len(header)
+    header += b' ' * (-headerLength % MATRIX_FILE_ALIGNMENT)
+    return MATRIX_FILE_MAGIC + len(header).to_bytes(4, 'little') + header
+
+def saveMatrixBinary(file, matrix, fingerprint, verbose=True):
+    """Save a 2D matrix as a small json header (shape, dtype, word list fingerprint)
+    followed by the raw matrix data, aligned so it can be memory mapped"""
+    # write to a temp file first so any existing memory maps of the old file stay valid
+    if verbose:
+        print(f'Writing matrix to {file}...', end='', flush=True)
+    with open(file + '.tmp', 'wb') as f:
+        f.write(matrixHeader(matrix.shape, matrix.dtype, fingerprint))
+        f.write(np.ascontiguousarray(matrix).tobytes())
+    os.replace(file + '.tmp', file)
+    if verbose:
+        print(f'wrote matrix to file!', flush=True)
+
+def createMatrixBinary(file, shape, matrixDtype, fingerprint):
+    """Create file.tmp with the header for a matrix and return a writable memory map of its data,
+    so a matrix bigger than memory can be filled in block by block.
+    Call finishMatrixBinary once it is filled"""
+    header = matrixHeader(shape, matrixDtype, fingerprint)
+    with open(file + '.tmp', 'wb') as f:
+        f.write(header)
+        f.truncate(len(header) + int(np.prod(shape)) * np.dtype(matrixDtype).itemsize)
+    return np.memmap(file + '.tmp', dtype=matrixDtype, mode='r+', offset=len(header), shape=tuple(shape))
+
+def finishMatrixBinary(file, matrix, fingerprint):
+    """Flush a matrix made by createMatrixBinary, move it into place and memory map it read only"""
+    matrix.flush()
+    del matrix
+    os.replace(file + '.tmp', file)
+    return importMatrixBinary(file, fingerprint)
+
+def readMatrixHeader(file):
+    """Return (header dict, data offset) of a binary matrix file, or (None, 0) if it is not one"""
+    with open(file, 'rb') as f:
+        if f.read(len(MATRIX_FILE_MAGIC)) != MATRIX_FILE_MAGIC:
+            return None, 0
+        headerLength = int.from_bytes(f.read(4), 'little')
+        header = json.loads(f.read(headerLength).decode('ascii'))
+    return header, len(MATRIX_FILE_MAGIC) + 4 + headerLength
+
+def importMatrixBinary(file, fingerprint):
+    """Memory map a binary matrix file without copying it.
+    Return None if the file was built from different word lists"""
+    print(f'Importing matrix from {file}...', end='', flush=True)
+    startTime = timeit.default_timer()
+    
+    header, offset = readMatrixHeader(file)
+    if header is None or header['fingerprint'] != fingerprint:
+        print('word list fingerprint mismatch', flush=True)
+        return None
+    matrix = np.memmap(file, dtype=np.dtype(header['dtype']), mode='r', offset=offset, shape=tuple(header['shape']))
+    
+    endTime = timeit.default_timer()
+    elapsedTime = endTime - startTime
+    formatted_time = "{:.2f}".format(elapsedTime)
+    print(f'Imported a {matrix.shape[0]} x {matrix.shape[1]} matrix in {formatted_time} sec', flush=True)
+    return matrix
+
 def initializePatternMatrix(solutionWordList, guessesWordList):
     """Given the word list, create a 2D matrix of all patterns.
-    with gray=0, yellow=1, green=2 at each of 5 positions, the pattern
-    can be saved uniquely as an int between 0 and 3^5.
-    Use patternMatrix[guessIndex][answerIndex] to find the pattern score"""
+    with gray=0, yellow=1, green=2 at each of L positions, the pattern
+    can be saved uniquely as an int between 0 and 3^L.
+    Use patternMatrix[guessIndex][answerIndex] to find the pattern score
+    Patterns are computed in blocks of guesses at a time with numpy and streamed straight into
+    the binary file, so only one block is ever held in memory"""
     print('Generating pattern matrix...', flush=True)
     
     startTime = timeit.default_timer()
     
-    tmp = [[0 for _ in range(len(solutionWordList))] for _ in range(len(guessesWordList))]
-    patternMatrix = np.array(tmp, dtype=uint8)
+    guessCodes = encodeWords(guessesWordList)
+    answerCodes = encodeWords(solutionWordList)
+    wordLength = answerCodes.shape[1]
+    blockSize = patternBlockSize(len(solutionWordList), wordLength)
+    fingerprint = wordListFingerprint(solutionWordList, guessesWordList)
+    patternMatrix = createMatrixBinary(PATTERN_MATRIX_BIN_FILE, (len(guessesWordList), len(solutionWordList)), patternDtype(wordLength), fingerprint)
     
-    for i in range(len(guessesWordList)):
-        if i%100 == 0 and i>0:
-            print(f'{i}/{len(guessesWordList)} pattern rows generated', flush=True)
-        for j in range(len(solutionWordList)):
-            guess = guessesWordList[i]
-            answer = solutionWordList[j]
-            
-            pattern = determinePattern(answer, guess)
-            score = patternScore(pattern)
-            patternMatrix[i][j] = uint8(score)
+    for start in range(0, len(guessesWordList), blockSize):
+        if start%(10*blockSize) == 0 and start>0:
+            print(f'{start}/{len(guessesWordList)} pattern rows generated', flush=True)
+        end = min(start + blockSize, len(guessesWordList))
+        patternMatrix[start:end] = computePatternBlock(guessCodes[start:end], answerCodes)
             
     endTime = timeit.default_timer()
     elapsedTime = endTime - startTime
     formatted_time = "{:.2f}".format(elapsedTime)
     
     print(f'{len(guessesWordList)}/{len(guessesWordList)} pattern rows generated in {formatted_time} sec', flush=True)
-
-    print(f'Writing pattern matrix to file...', end='', flush=True)
-    file = open(PATTERN_MATRIX_FILE, 'w')
-    for line in patternMatrix:
-        file.write(' '.join(str(x) for x in line))
-        file.write('\n')
-    file.close()
-    print(f'Wrote pattern matrix to file!', flush=True)
     
+    return finishMatrixBinary(PATTERN_MATRIX_BIN_FILE, patternMatrix, fingerprint)
+
+def patternCount(wordLength):
+    """Number of distinct patterns for a word length, 3^L"""
+    return 3**wordLength
+
+def allGreenPattern(wordLength):
+    """Pattern score of a correct guess, 3^L-1"""
+    return patternCount(wordLength) - 1
+
+def patternDtype(wordLength):
+    """Smallest unsigned dtype that holds every pattern score of a word length"""
+    if patternCount(wordLength) <= 2**8:
+        return np.dtype(uint8)
+    if patternCount(wordLength) <= 2**16:
+        return np.dtype(uint16)
+    return np.dtype(np.uint32)
+
+def patternBlockSize(numAnswers, wordLength):
+    """Number of guess rows computePatternBlock can do at once within PATTERN_MEMORY_BUDGET.
+    Its largest temporaries are a few (guesses x answers x L x L) boolean arrays"""
+    bytesPerRow = 3 * numAnswers * wordLength * wordLength
+    return max(1, min(PATTERN_BLOCK_SIZE, PATTERN_MEMORY_BUDGET // bytesPerRow))
+
+def analysisChunkSize(numPatterns, numColumns):
+    """Number of guess rows a histogram or freq matrix pass can do at once within PATTERN_MEMORY_BUDGET.
+    Its largest temporaries are a few (rows x numPatterns) 8 byte arrays and the int64 copy of the
+    rows' numColumns patterns"""
+    bytesPerRow = 8 * (4 * numPatterns + 2 * numColumns)
+    return max(1, min(ANALYSIS_CHUNK_SIZE, PATTERN_MEMORY_BUDGET // bytesPerRow))
+
+def initializePatternMatrixScalar(solutionWordList, guessesWordList):
+    """Reference implementation of the pattern matrix that calls determinePattern for every cell.
+    Far too slow for the full word lists, but useful to check computePatternBlock against"""
+    patternMatrix = np.zeros((len(guessesWordList), len(solutionWordList)), dtype=patternDtype(len(solutionWordList[0])))
+    for i in range(len(guessesWordList)):
+        for j in range(len(solutionWordList)):
+            pattern = determinePattern(solutionWordList[j], guessesWordList[i])
+            patternMatrix[i][j] = patternScore(pattern)
     return patternMatrix
 
-def makePatternFreqMatrix(patternMatrix):
-    """If the pattern freq matrix exists as a file, import it. Otherwise, generate one and save it to file"""
-    if os.path.exists(PATTERN_FREQ_MATRIX_FILE):
-        return importPatternFreqMatrix()
-    return initializePatternFreqMatrix(patternMatrix)
+def verifyPatternEngine(solutionWordList, guessesWordList, numGuesses=200, seed=0):
+    """Differential test: compare the vectorized pattern engine against the scalar
+    reference for a random sample of guesses (plus a few duplicate letter words).
+    Return the number of mismatched cells"""
+    rng = np.random.default_rng(seed)
+    sample = rng.choice(len(guessesWordList), size=min(numGuesses, len(guessesWordList)), replace=False)
+    sampleWords = [guessesWordList[i] for i in sample]
+    if len(solutionWordList[0]) == 5:
+        sampleWords += ['eerie', 'speed', 'llama', 'geese']
+    
+    vectorized = computePatternBlock(encodeWords(sampleWords), encodeWords(solutionWordList))
+    reference = initializePatternMatrixScalar(solutionWordList, sampleWords)
+    mismatches = int(np.count_nonzero(vectorized != reference))
+    print(f'Checked {vectorized.size} patterns against the scalar reference, {mismatches} mismatches', flush=True)
+    return mismatches
+
+def encodeWords(wordList):
+    """Encode a list of equal length words as a 2D uint8 array of letter codes"""
+    return np.frombuffer(''.join(wordList).encode('ascii'), dtype=uint8).reshape(len(wordList), -1)
+
+def computePatternBlock(guessCodes, answerCodes):
+    """Vectorized determinePattern + patternScore for a block of guesses against all answers.
+    Follows the same duplicate letter rules as determinePattern: a non-green guess letter is
+    yellow only if fewer earlier non-green copies of it in the guess were marked yellow than
+    there are non-green copies of it in the answer.
+    Returns a (numGuesses x numAnswers) array of pattern scores, dtype from patternDtype"""
+    wordLength = guessCodes.shape[1]
+    guesses = guessCodes[:, None, :]  # (g, 1, L)
+    answers = answerCodes[None, :, :] # (1, a, L)
+    
+    green = guesses == answers        # (g, a, L)
+    
+    # number of non-green answer positions holding each guess letter
+    letterMatch = guesses[:, :, :, None] == answers[:, :, None, :]             # (g, a, L guess, L answer)
+    available = np.count_nonzero(letterMatch & ~green[:, :, None, :], axis=3)  # (g, a, L)
     
+    # number of earlier non-green guess positions with the same letter
+    sameLetter = guessCodes[:, :, None] == guessCodes[:, None, :]              # (g, L, L)
+    earlier = np.tril(np.ones((wordLength, wordLength), dtype=bool), -1)
+    rank = np.count_nonzero((sameLetter & earlier)[:, None, :, :] & ~green[:, :, None, :], axis=3)
+    
+    yellow = ~green & (rank < available)
+    
+    pattern = 2*green.astype(uint8) + yellow.astype(uint8)
+    weights = (3 ** np.arange(wordLength - 1, -1, -1)).astype(np.int64)
+    return (pattern @ weights).astype(patternDtype(wordLength))
+
+def makePatternFreqMatrix(patternMatrix, fingerprint, numPatterns):
+    """If the binary pattern freq matrix exists and matches the word lists, memory map it.
+    If only the old text file exists and a sample of its rows match the pattern matrix,
+    import it once and convert it to the binary format. Otherwise, generate one and save it to file"""
+    if os.path.exists(PATTERN_FREQ_MATRIX_BIN_FILE):
+        patternFreqMatrix = importMatrixBinary(PATTERN_FREQ_MATRIX_BIN_FILE, fingerprint)
+        if patternFreqMatrix is not None:
+            return patternFreqMatrix
+        print('Pattern freq matrix file is stale, rebuilding', flush=True)
+    elif os.path.exists(PATTERN_FREQ_MATRIX_FILE):
+        patternFreqMatrix = importPatternFreqMatrix()
+        if patternFreqMatrix.shape == (len(patternMatrix), numPatterns) and textFreqMatrixMatches(patternFreqMatrix, patternMatrix, numPatterns):
+            saveMatrixBinary(PATTERN_FREQ_MATRIX_BIN_FILE, patternFreqMatrix, fingerprint)
+            return importMatrixBinary(PATTERN_FREQ_MATRIX_BIN_FILE, fingerprint)
+        print('Pattern freq matrix text file does not match the word lists, rebuilding', flush=True)
+    return initializePatternFreqMatrix(patternMatrix, fingerprint, numPatterns)
+    
+def textFreqMatrixMatches(patternFreqMatrix, patternMatrix, numPatterns):
+    """Recount a sample of rows of a freq matrix imported from the old text file from the
+    (fingerprinted) pattern matrix"""
+    rows = sampleRowIndices(len(patternMatrix))
+    return np.array_equal(patternFreqMatrix[rows], patternHistogram(patternMatrix[rows], numPatterns))
+
 def importPatternFreqMatrix():
-    print('Importing pattern freq matrix from file...', end='', flush=True)
+    """Import the old space separated text format of the pattern freq matrix"""
+    print('Importing pattern freq matrix from text file...', end='', flush=True)
     
     startTime = timeit.default_timer()
     
-    tmp = list()
-    with open(PATTERN_FREQ_MATRIX_FILE) as file:
-        tmp = [[int(n) for n in line.split()] for line in file]
-    patternFreqMatrix = np.array(tmp, uint16)
+    patternFreqMatrix = importMatrixText(PATTERN_FREQ_MATRIX_FILE, uint16)
     
     endTime = timeit.default_timer()
     elapsedTime = endTime - startTime
@@ -108,144 +356,266 @@ def importPatternFreqMatrix():
     print(f'Imported a {patternFreqMatrix.shape[0]} x {patternFreqMatrix.shape[1]} matrix in {formatted_time} sec', flush=True)
     return patternFreqMatrix
     
-def initializePatternFreqMatrix(patternMatrix):
+def initializePatternFreqMatrix(patternMatrix, fingerprint, numPatterns, chunkSize=None):
     """Given the pattern matrix, create patternFreqMatrix such that
     patternFreqMatrix[guessIndex][patternScore] to find num valid answers.
     In other words, a freq table of the number of answers that produce the given pattern
-    when the given guess is tested against them"""
+    when the given guess is tested against them.
+    The pattern matrix is read and the freq matrix written to file one block of rows at a time,
+    chunkSize rows (sized from PATTERN_MEMORY_BUDGET by default)"""
     print('Generating pattern freq matrix...', end='', flush=True)
+    if chunkSize is None:
+        chunkSize = analysisChunkSize(numPatterns, patternMatrix.shape[1])
     
-    tmp = [[0 for _ in range(3**5)] for _ in range(len(patternMatrix))]
-    patternFreqMatrix = np.array(tmp, dtype=uint16)
+    freqDtype = uint16 if patternMatrix.shape[1] < 2**16 else np.uint32
+    patternFreqMatrix = createMatrixBinary(PATTERN_FREQ_MATRIX_BIN_FILE, (len(patternMatrix), numPatterns), freqDtype, fingerprint)
     
     startTime = timeit.default_timer()
     
-    for i in range(len(patternMatrix)):
-        for j in range(len(patternMatrix[0])):
-            pattern = patternMatrix[i][j]
-            patternFreqMatrix[i][pattern] += 1
+    for start in range(0, len(patternMatrix), chunkSize):
+        end = min(start + chunkSize, len(patternMatrix))
+        patternFreqMatrix[start:end] = patternHistogram(patternMatrix[start:end], numPatterns)
             
     endTime = timeit.default_timer()
     elapsedTime = endTime - startTime
     formatted_time = "{:.2f}".format(elapsedTime)
     print(f"Pattern freq matrix generated in {formatted_time} sec", flush=True)
     
-    print(f'Writing pattern freq matrix to file...', end='', flush=True)
-    file = open(PATTERN_FREQ_MATRIX_FILE, 'w')
-    for line in patternFreqMatrix:
-        file.write(' '.join(str(x) for x in line))
-        file.write('\n')
-    file.close()
-    print(f'Wrote pattern freq matrix to file!', flush=True)
+    return finishMatrixBinary(PATTERN_FREQ_MATRIX_BIN_FILE, patternFreqMatrix, fingerprint)
+
+def patternHistogram(patternRows, numPatterns=None):
+    """Count the patterns in each row of a 2D block of the pattern matrix in a single bincount.
+    Returns a (numRows x numPatterns) array where [row][pattern] is the number of occurrences.
+    numPatterns defaults to just enough columns for the largest pattern in the block"""
+    numRows = len(patternRows)
+    if numPatterns is None:
+        numPatterns = int(np.max(patternRows)) + 1 if np.size(patternRows) > 0 else 1
+    offsets = np.arange(numRows, dtype=np.int64)[:, None] * numPatterns
+    flat = (np.asarray(patternRows, dtype=np.int64) + offsets).ravel()
+    return np.bincount(flat, minlength=numRows*numPatterns).reshape(numRows, numPatterns)
+
+class GuessEstimationStore:
+    """Evidence based estimates of how many guesses it takes to find which of n possible solutions
+    is correct. Kept as the sum of guesses and the number of scenarios seen for each n, so
+    avg(n) and count(n) are O(1) array lookups and statistics from many workers or runs merge
+    exactly by adding sums and counts. Evidence added since the last save is also tracked on
+    its own, so saving merges it into whatever is on disk instead of overwriting it"""
     
-    return patternFreqMatrix
+    def __init__(self, length):
+        self.sums = np.zeros(length, dtype=np.float64)
+        self.counts = np.zeros(length, dtype=np.int64)
+        self.newSums = np.zeros(length, dtype=np.float64)
+        self.newCounts = np.zeros(length, dtype=np.int64)
+    
+    def __len__(self):
+        return len(self.counts)
+    
+    def avg(self, numSolutions):
+        count = self.counts[numSolutions]
+        return self.sums[numSolutions] / count if count > 0 else 0.0
+    
+    def count(self, numSolutions):
+        return int(self.counts[numSolutions])
+    
+    def update(self, numSolutions, numGuesses):
+        self.sums[numSolutions] += numGuesses
+        self.counts[numSolutions] += 1
+        self.newSums[numSolutions] += numGuesses
+        self.newCounts[numSolutions] += 1
+    
+    def merge(self, other):
+        """Add the evidence other collected since it was created or last saved"""
+        self.sums += other.newSums
+        self.counts += other.newCounts
+        self.newSums += other.newSums
+        self.newCounts += other.newCounts
+    
+    def emptyCopy(self):
+        """A store with no evidence of the same length, e.g. for a worker to collect updates in"""
+        return GuessEstimationStore(len(self))
+    
+    def copy(self):
+        """A copy with the same estimates, whose new evidence is tracked separately from this one"""
+        store = GuessEstimationStore(len(self))
+        store.sums[:] = self.sums
+        store.counts[:] = self.counts
+        return store
+
+def guessEstimationFingerprint(length):
+    return f'guess-estimation-{length}'
+
+def blankGuessEstimationStore(length):
+    store = GuessEstimationStore(length)
+    store.sums[1], store.counts[1] = 1.0, 1 # one possible word = 1 guess
+    store.sums[2], store.counts[2] = 1.5, 1 # two possible words = 1.5 guesses on avg
+    return store
+
+def readGuessEstimationFile(length):
+    """Return the store saved in GUESS_ESTIMATION_STORE_FILE, converted from the old
+    GUESS_ESTIMATION_ARRAY text file (avg count per line) if only that exists, or None"""
+    if os.path.exists(GUESS_ESTIMATION_STORE_FILE):
+        header = readMatrixHeader(GUESS_ESTIMATION_STORE_FILE)[0]
+        if header is not None and header['fingerprint'] == guessEstimationFingerprint(length):
+            data = attachMatrix(GUESS_ESTIMATION_STORE_FILE)
+            store = GuessEstimationStore(length)
+            store.sums[:] = data[:, 0]
+            store.counts[:] = data[:, 1]
+            return store
+    elif os.path.exists(GUESS_ESTIMATION_ARRAY):
+        data = np.loadtxt(GUESS_ESTIMATION_ARRAY, ndmin=2)
+        if len(data) == length:
+            store = GuessEstimationStore(length)
+            store.counts[:] = data[:, 1]
+            store.sums[:] = data[:, 0] * store.counts
+            return store
+    return None
+
+@contextlib.contextmanager
+def fileLock(file):
+    """Cross process lock on file, held as an OS lock on file.lock (flock, or msvcrt.locking on
+    Windows). The OS releases it when its owner exits, even after a crash, so no lock is ever
+    left behind and the lock file itself is never removed"""
+    with open(file + '.lock', 'a+b') as f:
+        if os.name == 'nt':
+            f.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    pass # LK_LOCK gives up after 10 sec, keep waiting
+        else:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if os.name == 'nt':
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+            else:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
 
 def importGuessEstimationArray(length):
-    """If the guess estimation array file exists, import it. Otherwise, initialize a blank one
-    guessEstimation[n][0] contains an evidence-based estimation of how many guesses is necessary
+    """If the guess estimation file exists, import it. Otherwise, initialize a blank one.
+    store.avg(n) contains an evidence-based estimation of how many guesses is necessary
     to find which of n possible solutions is correct
-    guessEstimation[n][1] contains the number of scenarios that have combined to reach that average"""
-    if os.path.exists(GUESS_ESTIMATION_ARRAY):
-        print(f'Importing guess estimation array...', end='', flush=True)
-        f = open(GUESS_ESTIMATION_ARRAY, 'r')
-        lines = f.readlines()
-        f.close()
-        
-        guessEstArray = list()
-        for line in lines:
-            avg, count = line.strip().split()
-            guessEstArray.append([float(avg), int(count)])
-
-        print(f'imported a {len(guessEstArray)} x {len(guessEstArray[0])} matrix', flush=True)
-        return guessEstArray
-    else:
-        print(f'Generating blank guess estimation array',  flush=True)
-        estArray = [[0.0, 0] for _ in range(length)]
-        estArray[1] = [1.0, 1] # one possible word = 1 guess
-        estArray[2] = [1.5, 1] # two possible words = 1.5 guesses on avg
-        return estArray
+    store.count(n) contains the number of scenarios that have combined to reach that average"""
+    store = readGuessEstimationFile(length)
+    if store is not None:
+        print(f'Imported guess estimation array of length {length}', flush=True)
+        return store
+    print(f'Generating blank guess estimation array',  flush=True)
+    return blankGuessEstimationStore(length)
      
 def saveGuessEstimationArray(guessEstArray):
-    """Save the guess estimation array to file"""
-    file = open(GUESS_ESTIMATION_ARRAY, 'w')
-    for avg, count in guessEstArray:
-        file.write(str(avg) + ' ' + str(count) + '\n')
-    file.close()
+    """Merge the evidence collected since the last save into the guess estimation file.
+    The read, merge and atomic rewrite happen under a file lock so concurrent runs
+    never lose each other's evidence. Safe to call repeatedly as a checkpoint"""
+    length = len(guessEstArray)
+    with fileLock(GUESS_ESTIMATION_STORE_FILE):
+        store = readGuessEstimationFile(length)
+        if store is None:
+            store = blankGuessEstimationStore(length)
+        store.merge(guessEstArray)
+        saveMatrixBinary(GUESS_ESTIMATION_STORE_FILE, np.column_stack([store.sums, store.counts.astype(np.float64)]), guessEstimationFingerprint(length), verbose=False)
+    guessEstArray.newSums[:] = 0
+    guessEstArray.newCounts[:] = 0
     
 def updateGuessEstimationArray(numSolutions, numGuesses, guessEstArray):
     """Given the number of guesses it took to solve a certain number of solutions,
     update the current best estimate"""
-    currAvg, count = guessEstArray[numSolutions]
-    newAvg = (currAvg * count + numGuesses) / (count + 1)    
-    guessEstArray[numSolutions] = [newAvg, count+1]
+    guessEstArray.update(numSolutions, numGuesses)
 
 def determinePattern(answer, guess):
     """Given a guess and answer, determine a pattern for the guess where
     0=gray, 1=yellow, 2=green"""
-    pattern = [0,0,0,0,0]
+    wordLength = len(guess)
+    pattern = [0] * wordLength
 
     #determine greens
-    for pos in range(5):
+    for pos in range(wordLength):
         if guess[pos] == answer[pos]:
             pattern[pos] = 2
 
     #determine yellows
     #for each answer char that isn't already green, the *first* occurrence of the
     #guess char that isn't yellow or green should be changed to yellow
-    for ansPos in range(5):
+    for ansPos in range(wordLength):
         if pattern[ansPos] != 2:
             c = answer[ansPos]
-            for guessPos in range(5):
+            for guessPos in range(wordLength):
                 if pattern[guessPos] == 0 and guess[guessPos] == c:
                     pattern[guessPos] = 1
                     break
     return pattern
 
 def patternScore(pattern):
-    """input: list of 5 integers where 0=gray 1=yellow 2=green
-    output: unique int between 0 and 3^5-1"""
-    ret = pattern[0]*(3**4) + pattern[1]*(3**3) + pattern[2]*(3**2) + pattern[3]*3 + pattern[4]
+    """input: list of L integers (5 for regular wordle) where 0=gray 1=yellow 2=green
+    output: unique int between 0 and 3^L-1"""
+    ret = 0
+    for color in pattern:
+        ret = ret*3 + color
     return ret
 
-def analyzeGuesses(allWordsList, patternMatrix, patternFreqMatrix):
+def decodePattern(score, wordLength):
+    """Inverse of patternScore: list of wordLength integers where 0=gray 1=yellow 2=green"""
+    pattern = [0] * wordLength
+    for pos in range(wordLength - 1, -1, -1):
+        pattern[pos] = score % 3
+        score //= 3
+    return pattern
+
+def analyzeGuesses(allWordsList, patternMatrix, patternFreqMatrix, chunkSize=None):
     """Analyze all combinations of answer and first guess, each time determining
     the number of remaining valid words the answer could be. Return an array of the
-    sum total remaining possibilities given an initial guess"""
-    remaining = [0 for _ in range(len(patternMatrix))]
+    sum total remaining possibilities given an initial guess.
+    Works on chunkSize guess rows at a time (sized from PATTERN_MEMORY_BUDGET by default): for
+    each answer, gather the frequency of the pattern it produces and sum across the row"""
+    numGuesses = len(patternMatrix)
+    if chunkSize is None:
+        chunkSize = analysisChunkSize(patternFreqMatrix.shape[1], patternMatrix.shape[1])
+    remaining = np.zeros(numGuesses, dtype=np.int64)
 
     print('Starting first guess analysis...', flush=True)
     startTime = timeit.default_timer()
-    for answerIndex in range(len(patternMatrix[0])):     
+    for start in range(0, numGuesses, chunkSize):
         #provide intermittent progress updates
-        if answerIndex%100 == 0 and answerIndex > 1:
+        if start%(10*chunkSize) == 0 and start > 0:
             currTime = timeit.default_timer()
             elapsedTime = currTime - startTime
-            predTime = elapsedTime*(len(patternMatrix[0])/(answerIndex)) - elapsedTime
-            formatted_time = "{:.2f}".format(predTime/60)
-            lowestRem = min(remaining)
-            bestWord = allWordsList[remaining.index(lowestRem)]
-            formattedBestRem = "{:.1f}".format(lowestRem/answerIndex)
-            print(f"{answerIndex}/{len(patternMatrix[0])} answers analyzed, ~{formatted_time} mins remaining", flush=True)
-            print(f'{bestWord} is the best initial guess so far with {formattedBestRem} words remaining\n')
-               
-        for firstGuessIndex in range(len(patternMatrix)):
-            pattern = patternMatrix[firstGuessIndex][answerIndex]
-            remaining[firstGuessIndex] += patternFreqMatrix[firstGuessIndex][pattern]
-
-    return remaining
+            predTime = elapsedTime*(numGuesses/start) - elapsedTime
+            formatted_time = "{:.2f}".format(predTime)
+            bestIndex = int(np.argmin(remaining[:start]))
+            formattedBestRem = "{:.1f}".format(remaining[bestIndex]/len(patternMatrix[0]))
+            print(f"{start}/{numGuesses} guesses analyzed, ~{formatted_time} sec remaining", flush=True)
+            print(f'{allWordsList[bestIndex]} is the best initial guess so far with {formattedBestRem} words remaining\n')
+        
+        end = min(start + chunkSize, numGuesses)
+        remaining[start:end] = analyzeGuessChunk(patternMatrix, patternFreqMatrix, start, end)
+
+    endTime = timeit.default_timer()
+    formatted_time = "{:.2f}".format(endTime - startTime)
+    print(f'First guess analysis finished in {formatted_time} sec', flush=True)
+    return remaining.tolist()
+
+def analyzeGuessChunk(patternMatrix, patternFreqMatrix, start, end):
+    """Sum of remaining possibilities over all answers for guesses start..end-1"""
+    patterns = np.asarray(patternMatrix[start:end], dtype=np.intp)
+    freqs = np.asarray(patternFreqMatrix[start:end], dtype=np.int64)
+    return np.take_along_axis(freqs, patterns, axis=1).sum(axis=1)
 
 def firstGuessAnalysis():
     """Main driver function to run analysis on the best first guess with no lookahead"""
     # load word lists from file
     allWordsList = loadWordList(ALL_WORDS_FILE)
     solutionWordsList = loadWordList(SOLUTION_WORDS_FILE)
-    print(f"{len(allWordsList)} 5-letter words in dictionary", flush=True)
+    print(f"{len(allWordsList)} {len(allWordsList[0])}-letter words in dictionary", flush=True)
     print(f"{len(solutionWordsList)} of those are possible solutions\n", flush=True)
     
     # use word lists to create pattern matrix and pattern frequency matrix
     patternMatrix = makePatternMatrix(solutionWordsList, allWordsList)
     print(patternMatrix, end='\n\n')
-    patternFreqMatrix = makePatternFreqMatrix(patternMatrix)
+    patternFreqMatrix = makePatternFreqMatrix(patternMatrix, wordListFingerprint(solutionWordsList, allWordsList), patternCount(len(allWordsList[0])))
     print(patternFreqMatrix, end='\n\n')
     
     # use pattern matrices to analyze the best first guess
@@ -289,14 +659,14 @@ def isHardModeGuessBetter(initialSetSize, hardModeAvgSize, nonHardModeAvgSize, g
     """
     hardModeFloor = int(hardModeAvgSize)
     nonHardModeFloor = int(nonHardModeAvgSize)
-    if guessEstArray[hardModeFloor][1] != 0 and guessEstArray[hardModeFloor+1][1] != 0:
-        if guessEstArray[nonHardModeFloor][1] != 0 and guessEstArray[nonHardModeFloor+1][1] != 0:
+    if guessEstArray.count(hardModeFloor) != 0 and guessEstArray.count(hardModeFloor+1) != 0:
+        if guessEstArray.count(nonHardModeFloor) != 0 and guessEstArray.count(nonHardModeFloor+1) != 0:
             hardModeDecimal = hardModeAvgSize - hardModeFloor
-            hardModeFurtherExpectedGuesses = (1-hardModeDecimal) * guessEstArray[hardModeFloor][0] + hardModeDecimal * guessEstArray[hardModeFloor+1][0]
+            hardModeFurtherExpectedGuesses = (1-hardModeDecimal) * guessEstArray.avg(hardModeFloor) + hardModeDecimal * guessEstArray.avg(hardModeFloor+1)
             hardModeExpectedGuesses = 1 + ((initialSetSize-1)/initialSetSize) * hardModeFurtherExpectedGuesses
             
             nonHardModeDecimal = nonHardModeAvgSize - nonHardModeFloor
-            nonHardModeFurtherExpectedGuesses = (1-nonHardModeDecimal) * guessEstArray[nonHardModeFloor][0] + nonHardModeDecimal * guessEstArray[nonHardModeFloor+1][0]
+            nonHardModeFurtherExpectedGuesses = (1-nonHardModeDecimal) * guessEstArray.avg(nonHardModeFloor) + nonHardModeDecimal * guessEstArray.avg(nonHardModeFloor+1)
             nonHardModeExpectedGuesses = 1 + nonHardModeFurtherExpectedGuesses
             
             # print scores for the 2 approaches
@@ -310,10 +680,172 @@ def isHardModeGuessBetter(initialSetSize, hardModeAvgSize, nonHardModeAvgSize, g
     # print('h-', end='')
     return True
 
-def makeBestGuess(answerIndex, possibleSolutionIndices, patternMatrix, guessEstArray, allWordsList):
+def indicesToBitset(indices, numSolutions):
+    """Pack a collection of solution indices into an int bitset, bit i set if solution i is possible"""
+    bools = np.zeros(numSolutions, dtype=bool)
+    bools[np.asarray(indices, dtype=np.intp)] = True
+    return int.from_bytes(np.packbits(bools, bitorder='little').tobytes(), 'little')
+
+def bitsetToIndices(bits, numSolutions):
+    """Unpack an int bitset into a sorted array of solution indices"""
+    data = np.frombuffer(bits.to_bytes((numSolutions + 7) // 8, 'little'), dtype=uint8)
+    return np.flatnonzero(np.unpackbits(data, bitorder='little')[:numSolutions])
+
+def fullBitset(numSolutions):
+    return (1 << numSolutions) - 1
+
+def bitsetSize(bits):
+    """Number of possible solutions in a bitset (popcount)"""
+    return bits.bit_count()
+
+class PatternMasks:
+    """Per (guess, pattern) bitsets of the solutions that give that pattern, so narrowing a candidate
+    set after a guess is a single AND. The masks of a guess row are built the first time the row
+    is used and the MASK_CACHE_ROWS most recently used rows are kept"""
+    
+    def __init__(self, patternMatrix):
+        self.patternMatrix = patternMatrix
+        self.numSolutions = patternMatrix.shape[1]
+        self.rows = collections.OrderedDict()
+    
+    def row(self, guessIndex):
+        """dict of pattern -> bitset for every pattern that guessIndex produces"""
+        if guessIndex in self.rows:
+            self.rows.move_to_end(guessIndex)
+            return self.rows[guessIndex]
+        patterns = np.asarray(self.patternMatrix[guessIndex])
+        uniquePatterns = np.unique(patterns)
+        packed = np.packbits(patterns[None, :] == uniquePatterns[:, None], axis=1, bitorder='little')
+        masks = {int(pattern): int.from_bytes(row.tobytes(), 'little') for pattern, row in zip(uniquePatterns, packed)}
+        self.rows[guessIndex] = masks
+        if len(self.rows) > MASK_CACHE_ROWS:
+            self.rows.popitem(last=False)
+        return masks
+    
+    def mask(self, guessIndex, pattern):
+        return self.row(guessIndex).get(pattern, 0)
+
+# one PatternMasks per pattern matrix in use
+patternMaskInstances = dict()
+
+def getPatternMasks(patternMatrix):
+    instance = patternMaskInstances.get(id(patternMatrix))
+    if instance is None or instance.patternMatrix is not patternMatrix:
+        instance = PatternMasks(patternMatrix)
+        patternMaskInstances[id(patternMatrix)] = instance
+    return instance
+
+# (pattern matrix, largest pattern + 1) per pattern matrix in use
+matrixPatternCounts = dict()
+
+def matrixPatternCount(patternMatrix):
+    """Number of histogram columns the patterns of patternMatrix need, found once per matrix"""
+    entry = matrixPatternCounts.get(id(patternMatrix))
+    if entry is None or entry[0] is not patternMatrix:
+        entry = (patternMatrix, int(np.max(patternMatrix)) + 1)
+        matrixPatternCounts[id(patternMatrix)] = entry
+    return entry[1]
+
+# opt in counters for makeBestGuess, see enableInstrumentation
+instrumentation = {'enabled': False}
+
+def enableInstrumentation(enabled=True):
+    """Reset and turn on (or off) the makeBestGuess counters: scoring inner loop evaluations
+    (guess x candidate cells scored), nodes, max recursion depth and the time spent choosing
+    the guess at each node"""
+    instrumentation.clear()
+    instrumentation.update({'enabled': enabled, 'scoringEvaluations': 0, 'nodes': 0, 'maxDepth': 0, 'nodeTimes': list(), 'nodeSizes': list()})
+
+def instrumentationReport():
+    """Summary of the makeBestGuess counters collected since enableInstrumentation"""
+    nodeTimes = np.array(instrumentation.get('nodeTimes', []))
+    report = {key: instrumentation.get(key, 0) for key in ('scoringEvaluations', 'nodes', 'maxDepth')}
+    if len(nodeTimes) > 0:
+        p50, p99 = np.percentile(nodeTimes * 1000, [50, 99])
+        report.update({'nodeTimeTotalSec': float(nodeTimes.sum()), 'nodeTimeP50Ms': float(p50), 'nodeTimeP99Ms': float(p99), 'nodeTimeMaxMs': float(nodeTimes.max() * 1000), 'largestNodeSize': max(instrumentation['nodeSizes'])})
+    return report
+
+def heuristicAvgBucketSize(histogram, numSolutions, isCandidate, guessEstArray):
+    """numSolutions / number of distinct patterns"""
+    return numSolutions / np.count_nonzero(histogram, axis=1)
+
+def heuristicExpectedRemaining(histogram, numSolutions, isCandidate, guessEstArray):
+    """Expected size of the remaining set, sum of squared bucket sizes / numSolutions"""
+    return (histogram.astype(np.int64)**2).sum(axis=1) / numSolutions
+
+def heuristicEntropy(histogram, numSolutions, isCandidate, guessEstArray):
+    """Shannon entropy H of the pattern distribution, as the set size it leaves: numSolutions / 2^H"""
+    sizes = np.arange(1, numSolutions + 1)
+    sizeTimesLog = np.r_[0, sizes * np.log2(sizes)] # lookup table, cheaper than a log per histogram cell
+    return 2 ** (sizeTimesLog[histogram].sum(axis=1) / numSolutions)
+
+def heuristicLargestBucket(histogram, numSolutions, isCandidate, guessEstArray):
+    """Size of the largest remaining set, the worst case"""
+    return histogram.max(axis=1)
+
+def heuristicExpectedGuesses(histogram, numSolutions, isCandidate, guessEstArray):
+    """Expected total number of guesses, looking up how many guesses each bucket size takes in
+    guessEstArray (interpolated for sizes without evidence). A guess that might be the answer
+    saves the last guess for its own bucket"""
+    sizes = np.arange(len(guessEstArray))
+    known = (guessEstArray.counts > 0) & (sizes > 2)
+    averages = guessEstArray.sums[known] / guessEstArray.counts[known]
+    guessesToSolve = np.interp(sizes, np.r_[0, 1, 2, sizes[known]], np.r_[0, 1, 1.5, averages])
+    further = (histogram * guessesToSolve[histogram]).sum(axis=1) - isCandidate * guessesToSolve[1]
+    return 1 + further / numSolutions
+
+# every heuristic maps a (numGuesses x numPatterns) histogram to a score per guess, lower is better.
+# all but expectedGuesses score by a remaining set size, so chooseGuess can weigh hard mode guesses
+GUESS_HEURISTICS = {
+    'avgBucketSize': heuristicAvgBucketSize,
+    'expectedRemaining': heuristicExpectedRemaining,
+    'entropy': heuristicEntropy,
+    'largestBucket': heuristicLargestBucket,
+    'expectedGuesses': heuristicExpectedGuesses,
+}
+
+def scoreGuesses(patternMatrix, possibleSolutionIndices, guessIndices=None, heuristic=None, guessEstArray=None, chunkSize=None):
+    """Score every guess against the set of possible solutions in one vectorized pass.
+    Takes the candidate columns of the pattern matrix, counts the patterns in each row
+    and returns an array where [guessIndex] is the heuristic's score of the histogram,
+    by default (GUESS_HEURISTIC) the avg remaining set size after that guess,
+    i.e. len(possibleSolutionIndices) / number of distinct patterns.
+    heuristic can also be a list of names, then a dict of score arrays is returned, all from the same histograms.
+    If guessIndices is given only those rows are scored and [i] is the score of guessIndices[i]"""
+    if heuristic is None:
+        heuristic = GUESS_HEURISTIC
+    names = heuristic if isinstance(heuristic, list) else [heuristic]
+    columns = np.asarray(possibleSolutionIndices)
+    numGuesses = len(patternMatrix) if guessIndices is None else len(guessIndices)
+    # guesses that are possible solutions themselves (guess i is solution i for i < numSolutions)
+    candidateMask = np.zeros(len(patternMatrix), dtype=bool)
+    candidateMask[columns] = True
+    scores = {name: np.empty(numGuesses) for name in names}
+    if chunkSize is None:
+        chunkSize = analysisChunkSize(matrixPatternCount(patternMatrix), len(columns))
+    for start in range(0, numGuesses, chunkSize):
+        end = min(start + chunkSize, numGuesses)
+        if guessIndices is None:
+            rows = patternMatrix[start:end, columns]
+            isCandidate = candidateMask[start:end]
+        else:
+            rows = patternMatrix[np.ix_(guessIndices[start:end], columns)]
+            isCandidate = candidateMask[guessIndices[start:end]]
+        histogram = patternHistogram(rows)
+        for name in names:
+            scores[name][start:end] = GUESS_HEURISTICS[name](histogram, len(columns), isCandidate, guessEstArray)
+    if instrumentation['enabled']:
+        instrumentation['scoringEvaluations'] += numGuesses * len(columns)
+    return scores if isinstance(heuristic, list) else scores[names[0]]
+
+def makeBestGuess(answerIndex, possibleSolutionIndices, patternMatrix, guessEstArray, allWordsList, depth=0, possibleSolutionBits=None):
     """Given the subset of words that can still be the solution, 
     implement a strategy to make the best guess, then continue until the solution is found.
-    Return the number of guesses needed to reach the solution"""
+    Return the number of guesses needed to reach the solution.
+    possibleSolutionBits is the same subset as a bitset, it is computed if not given"""
+    if instrumentation['enabled']:
+        instrumentation['maxDepth'] = max(instrumentation['maxDepth'], depth)
+    
     # if only one solution remains, we've found it
     if len(possibleSolutionIndices) == 1:
         print(f"{allWordsList[possibleSolutionIndices[0]]} ", end='')
@@ -328,50 +860,12 @@ def makeBestGuess(answerIndex, possibleSolutionIndices, patternMatrix, guessEstA
             print(f"{allWordsList[possibleSolutionIndices[1]]} ", end='')
             return 2
     
-    # 3+ words remain, so we have to weigh two strategies
-    # 1. making a "hard mode" guess to potentially get the answer right this turn
-    # 2. guessing a word that cannot be the right answer, but might narrow down the potential solutions better than #1
-    
-    # 1. find the best 'hard mode' guess. this is based on avg solution set size, not perfectly solved
-    hardModeGuessIndex = -1
-    hardModeGuessAvgRemSetSize = -1
-    for guessIndex in possibleSolutionIndices:
-        patternsDict = dict()
-        for solutionIndex in possibleSolutionIndices:
-            pattern = patternMatrix[guessIndex][solutionIndex]
-            if pattern in patternsDict.keys():
-                patternsDict[pattern] += 1
-            else:
-                patternsDict[pattern] = 1
-        avgRemainingSetSize = sum(patternsDict.values()) / len(patternsDict) 
-        if avgRemainingSetSize < hardModeGuessAvgRemSetSize or hardModeGuessAvgRemSetSize == -1:
-            hardModeGuessIndex = guessIndex
-            hardModeGuessAvgRemSetSize = avgRemainingSetSize  
-            
-    # 2. find the best 'non-hard mode' guess. this is based on avg solution set size, not perfectly solved
-    nonHardModeGuessIndex = -1
-    nonHardModeGuessAvgRemSetSize = -1
-    for guessIndex in range(len(patternMatrix)):
-        patternsDict = dict()
-        for solutionIndex in possibleSolutionIndices:
-            pattern = patternMatrix[guessIndex][solutionIndex]
-            if pattern in patternsDict.keys():
-                patternsDict[pattern] += 1
-            else:
-                patternsDict[pattern] = 1
-        avgRemainingSetSize = sum(patternsDict.values()) / len(patternsDict) 
-        if avgRemainingSetSize < nonHardModeGuessAvgRemSetSize or nonHardModeGuessAvgRemSetSize == -1:
-            nonHardModeGuessIndex = guessIndex
-            nonHardModeGuessAvgRemSetSize = avgRemainingSetSize
-    
-    # decide between hard mode and non-hard mode
-    finalGuessIndex = -1
-    if isHardModeGuessBetter(len(possibleSolutionIndices), hardModeGuessAvgRemSetSize, nonHardModeGuessAvgRemSetSize, guessEstArray) == True:
-        # make the hard mode guess
-        finalGuessIndex = hardModeGuessIndex
-    else:
-        # make the non-hard mode guess
-        finalGuessIndex = nonHardModeGuessIndex
+    nodeStartTime = timeit.default_timer()
+    finalGuessIndex = chooseGuess(possibleSolutionIndices, patternMatrix, guessEstArray)
+    if instrumentation['enabled']:
+        instrumentation['nodes'] += 1
+        instrumentation['nodeTimes'].append(timeit.default_timer() - nodeStartTime)
+        instrumentation['nodeSizes'].append(len(possibleSolutionIndices))
     
     # print guess
     print(f"{allWordsList[finalGuessIndex]} ", end='')
@@ -382,29 +876,516 @@ def makeBestGuess(answerIndex, possibleSolutionIndices, patternMatrix, guessEstA
     if finalGuessIndex == answerIndex:
         solutionGuesses = 1
     else:
-        # make guess and narrow down possible solutions
-        myPossibleSolutionIndices = list()
-        pattern = patternMatrix[finalGuessIndex][answerIndex]
-        for index in possibleSolutionIndices:
-            if patternMatrix[finalGuessIndex][index] == pattern:
-                myPossibleSolutionIndices.append(index)
+        # make guess and narrow down possible solutions with a single AND
+        numSolutions = patternMatrix.shape[1]
+        if possibleSolutionBits is None:
+            possibleSolutionBits = indicesToBitset(possibleSolutionIndices, numSolutions)
+        pattern = int(patternMatrix[finalGuessIndex][answerIndex])
+        myPossibleSolutionBits = possibleSolutionBits & getPatternMasks(patternMatrix).mask(finalGuessIndex, pattern)
+        myPossibleSolutionIndices = bitsetToIndices(myPossibleSolutionBits, numSolutions).tolist()
                 
         # use recursive step to solve
-        solutionGuesses = 1 + makeBestGuess(answerIndex, myPossibleSolutionIndices, patternMatrix, guessEstArray, allWordsList)
+        solutionGuesses = 1 + makeBestGuess(answerIndex, myPossibleSolutionIndices, patternMatrix, guessEstArray, allWordsList, depth + 1, myPossibleSolutionBits)
     
     # update estimates of guesses to solve based on solution space
     updateGuessEstimationArray(len(possibleSolutionIndices), solutionGuesses, guessEstArray)
     
     return solutionGuesses
+
+def chooseGuess(possibleSolutionIndices, patternMatrix, guessEstArray, legalGuessIndices=None, heuristic=None):
+    """Return the index of the guess the strategy makes given the subset of words that can still be the solution.
+    legalGuessIndices (sorted) restricts the guesses considered, e.g. to the ones real hard mode allows.
+    heuristic is one of the GUESS_HEURISTICS names, GUESS_HEURISTIC if not given"""
+    # with one or two solutions left, guess the first one
+    if len(possibleSolutionIndices) <= 2:
+        return int(possibleSolutionIndices[0])
+    
+    # 3+ words remain, so we have to weigh two strategies
+    # 1. making a "hard mode" guess to potentially get the answer right this turn
+    # 2. guessing a word that cannot be the right answer, but might narrow down the potential solutions better than #1
+    
+    # score every guess at once. hard mode guesses are the subset of guesses that are still possible solutions
+    # the scores are based on avg solution set size, not perfectly solved
+    heuristic = heuristic or GUESS_HEURISTIC
+    avgRemSetSizes = scoreGuesses(patternMatrix, possibleSolutionIndices, legalGuessIndices, heuristic, guessEstArray)
+    
+    # expected guesses already weighs the chance of guessing the answer this turn
+    if heuristic == 'expectedGuesses':
+        bestScoredIndex = int(np.argmin(avgRemSetSizes))
+        return bestScoredIndex if legalGuessIndices is None else int(legalGuessIndices[bestScoredIndex])
+    
+    # 1. find the best 'hard mode' guess (possible solutions are always legal guesses)
+    if legalGuessIndices is None:
+        hardModeAvgRemSetSizes = avgRemSetSizes[possibleSolutionIndices]
+    else:
+        hardModeAvgRemSetSizes = avgRemSetSizes[np.searchsorted(legalGuessIndices, possibleSolutionIndices)]
+    hardModeGuessIndex = possibleSolutionIndices[int(np.argmin(hardModeAvgRemSetSizes))]
+    hardModeGuessAvgRemSetSize = float(hardModeAvgRemSetSizes.min())
+            
+    # 2. find the best 'non-hard mode' guess
+    bestScoredIndex = int(np.argmin(avgRemSetSizes))
+    nonHardModeGuessIndex = bestScoredIndex if legalGuessIndices is None else int(legalGuessIndices[bestScoredIndex])
+    nonHardModeGuessAvgRemSetSize = float(avgRemSetSizes[bestScoredIndex])
+    
+    # decide between hard mode and non-hard mode
+    if isHardModeGuessBetter(len(possibleSolutionIndices), hardModeGuessAvgRemSetSize, nonHardModeGuessAvgRemSetSize, guessEstArray) == True:
+        # make the hard mode guess
+        return int(hardModeGuessIndex)
+    # make the non-hard mode guess
+    return nonHardModeGuessIndex
+
+def makeStrategyNode(guessIndex, possibleSolutionBits, depth, numSolutions):
+    """A node of the strategy tree: the guess made once the solutions in the bitset remain after depth guesses.
+    children maps the pattern the guess produces to the next node, and is filled in lazily"""
+    candidates = bitsetToIndices(possibleSolutionBits, numSolutions)
+    return {'guess': guessIndex, 'bits': possibleSolutionBits, 'candidates': candidates, 'depth': depth, 'children': dict()}
+
+def getStrategyChild(node, pattern, patternMatrix, guessEstArray, strategyCache, heuristic=None):
+    """Return the child of node for the given pattern, building it with chooseGuess the first time.
+    Nodes are shared through strategyCache, keyed by (candidate set, depth), so an identical
+    subgame is only ever solved once"""
+    if pattern not in node['children']:
+        childBits = node['bits'] & getPatternMasks(patternMatrix).mask(node['guess'], pattern)
+        key = (childBits, node['depth'] + 1)
+        if key not in strategyCache:
+            child = makeStrategyNode(-1, childBits, node['depth'] + 1, patternMatrix.shape[1])
+            child['guess'] = chooseGuess(child['candidates'], patternMatrix, guessEstArray, heuristic=heuristic)
+            strategyCache[key] = child
+        node['children'][pattern] = strategyCache[key]
+    return node['children'][pattern]
+
+def solveAnswerPath(answerIndex, root, patternMatrix, guessEstArray, strategyCache, heuristic=None):
+    """Return the list of strategy tree nodes visited from root until answerIndex is guessed"""
+    path = [root]
+    node = root
+    while node['guess'] != answerIndex:
+        pattern = int(patternMatrix[node['guess'], answerIndex])
+        node = getStrategyChild(node, pattern, patternMatrix, guessEstArray, strategyCache, heuristic)
+        path.append(node)
+    return path
+
+def recordPathEvidence(path, guessEstArray):
+    """Add the guesses each node of a solved path needed to guessEstArray, the same way
+    makeBestGuess does (deepest node first)"""
+    # the root is the fixed first guess, and sets of 1 or 2 are never recorded
+    for i in range(len(path) - 1, 0, -1):
+        if len(path[i]['candidates']) > 2:
+            updateGuessEstimationArray(len(path[i]['candidates']), len(path) - i, guessEstArray)
+
+def replayStrategyTree(answerIndex, root, patternMatrix, guessEstArray, allWordsList, strategyCache, heuristic=None):
+    """Follow the strategy tree from root until answerIndex is guessed, building any missing nodes.
+    Updates guessEstArray the same way makeBestGuess does (deepest node first) and
+    returns the number of guesses needed, including the root guess"""
+    path = solveAnswerPath(answerIndex, root, patternMatrix, guessEstArray, strategyCache, heuristic)
+    for node in path:
+        print(f"{allWordsList[node['guess']]} ", end='')
+    
+    recordPathEvidence(path, guessEstArray)
+    return len(path)
+
+def exportStrategyTree(root, allWordsList):
+    """Save the strategy tree as one line per node:
+    nodeId guessWord numCandidates pattern:childId pattern:childId ...
+    Node 0 is the root. Patterns missing from a node were never reached"""
+    nodeIds = {id(root): 0}
+    order = [root]
+    for node in order:
+        for child in node['children'].values():
+            if id(child) not in nodeIds:
+                nodeIds[id(child)] = len(order)
+                order.append(child)
+    
+    file = open(STRATEGY_TREE_FILE, 'w')
+    for nodeId, node in enumerate(order):
+        children = ' '.join(f"{pattern}:{nodeIds[id(child)]}" for pattern, child in sorted(node['children'].items()))
+        file.write(f"{nodeId} {allWordsList[node['guess']]} {bitsetSize(node['bits'])} {children}".rstrip() + '\n')
+    file.close()
+    print(f'Wrote {len(order)} node strategy tree to file', flush=True)
+
+class SolverBudgetExceeded(Exception):
+    """Raised by the exact solver when its node or time budget runs out"""
+    pass
+
+def optimalLowerBound(numSolutions):
+    """Admissible lower bound on the total guesses needed to solve every one of numSolutions
+    possible solutions: at best one is guessed immediately and each of the others on the 2nd guess"""
+    return 2*numSolutions - 1
+
+def optimalGuessBounds(patternMatrix, possibleSolutionIndices, greenPattern, chunkSize=None):
+    """For every guess, a lower bound on the total guesses needed if it is guessed next:
+    one guess for each solution plus optimalLowerBound of each non-green bucket, i.e.
+    n + 2*(solutions not solved by the guess) - (number of non-green buckets)
+    Guesses that do not split the solutions at all get USELESS_GUESS_BOUND"""
+    n = len(possibleSolutionIndices)
+    columns = np.asarray(possibleSolutionIndices)
+    bounds = np.empty(len(patternMatrix), dtype=np.int64)
+    if chunkSize is None:
+        chunkSize = analysisChunkSize(greenPattern + 1, n)
+    for start in range(0, len(patternMatrix), chunkSize):
+        end = min(start + chunkSize, len(patternMatrix))
+        histogram = patternHistogram(patternMatrix[start:end, columns], greenPattern + 1)
+        greens = histogram[:, greenPattern]
+        numBuckets = np.count_nonzero(histogram, axis=1) - (greens > 0)
+        bounds[start:end] = n + 2*(n - greens) - numBuckets
+        # a guess that leaves every solution in one bucket makes no progress
+        bounds[start:end][(numBuckets == 1) & (greens == 0)] = USELESS_GUESS_BOUND
+    return bounds
+
+def splitByPattern(patternMatrix, guessIndex, possibleSolutionIndices, greenPattern):
+    """Split the possible solutions into the buckets guessIndex sorts them into,
+    leaving out the all green bucket. Largest bucket first"""
+    patterns = patternMatrix[guessIndex, possibleSolutionIndices]
+    order = np.argsort(patterns, kind='stable')
+    sortedPatterns = patterns[order]
+    splits = np.flatnonzero(sortedPatterns[1:] != sortedPatterns[:-1]) + 1
+    buckets = [possibleSolutionIndices[group] for group, start in zip(np.split(order, splits), np.r_[0, splits]) if sortedPatterns[start] != greenPattern]
+    buckets.sort(key=len, reverse=True)
+    return buckets
+
+def solveOptimalSubgame(possibleSolutionIndices, beta, solverState):
+    """Branch and bound search for the minimum total number of guesses needed to solve every
+    solution in possibleSolutionIndices, trying the solverState['topK'] guesses with the best bounds.
+    Returns the exact value if it is below beta, otherwise a lower bound that is >= beta.
+    Results are shared through the transposition cache solverState['cache'] keyed by candidate set bitset"""
+    n = len(possibleSolutionIndices)
+    if n <= 2:
+        return optimalLowerBound(n)
+    
+    cache = solverState['cache']
+    key = indicesToBitset(possibleSolutionIndices, solverState['patternMatrix'].shape[1])
+    if key in cache:
+        value, exact, _ = cache[key]
+        if exact or value >= beta:
+            return value
+    
+    solverState['nodes'] += 1
+    if solverState['nodes'] >= solverState['nodeBudget'] or timeit.default_timer() >= solverState['deadline']:
+        raise SolverBudgetExceeded()
+    if solverState['nodes'] % OPTIMAL_PROGRESS_INTERVAL == 0:
+        formatted_time = "{:.2f}".format(timeit.default_timer() - solverState['startTime'])
+        print(f"{solverState['nodes']} nodes searched, {len(cache)} subgames cached, {formatted_time} sec", flush=True)
+    
+    patternMatrix = solverState['patternMatrix']
+    bounds = optimalGuessBounds(patternMatrix, possibleSolutionIndices, solverState['allGreenPattern'])
+    topGuesses = np.argsort(bounds, kind='stable')[:solverState['topK']]
+    
+    best = beta
+    bestGuess = -1
+    for guessIndex in topGuesses:
+        if bounds[guessIndex] >= best:
+            break
+        total = bounds[guessIndex]
+        for bucket in splitByPattern(patternMatrix, guessIndex, possibleSolutionIndices, solverState['allGreenPattern']):
+            rest = total - optimalLowerBound(len(bucket))
+            total = rest + solveOptimalSubgame(bucket, best - rest, solverState)
+            if total >= best:
+                break
+        if total < best:
+            best = total
+            bestGuess = int(guessIndex)
+    
+    if bestGuess == -1:
+        # every guess was cut off, so the value is only known to be at least beta
+        best = max(beta, int(bounds[topGuesses[0]]))
+    cache[key] = (int(best), bestGuess != -1, bestGuess)
+    return int(best)
+
+def saveOptimalCheckpoint(cache, settings, numSolutions):
+    """Save the transposition cache, after a json header line with the settings it was built with,
+    one subgame per line: value exact bestGuess solutionIndex ..."""
+    file = open(OPTIMAL_CHECKPOINT_FILE + '.tmp', 'w')
+    file.write(json.dumps(settings) + '\n')
+    for key, (value, exact, bestGuess) in cache.items():
+        indices = ' '.join(str(x) for x in bitsetToIndices(key, numSolutions))
+        file.write(f"{value} {int(exact)} {bestGuess} {indices}\n")
+    file.close()
+    os.replace(OPTIMAL_CHECKPOINT_FILE + '.tmp', OPTIMAL_CHECKPOINT_FILE)
+
+def importOptimalCheckpoint(settings, numSolutions):
+    """Load a transposition cache saved by saveOptimalCheckpoint with the same settings,
+    or an empty one if there is none or it was built with other settings"""
+    cache = dict()
+    if os.path.exists(OPTIMAL_CHECKPOINT_FILE):
+        print(f'Importing optimal solver checkpoint...', end='', flush=True)
+        with open(OPTIMAL_CHECKPOINT_FILE) as file:
+            try:
+                savedSettings = json.loads(file.readline())
+            except ValueError:
+                savedSettings = None
+            if savedSettings != settings:
+                print(f'checkpoint was built with other settings, starting over', flush=True)
+                return cache
+            for line in file:
+                value, exact, bestGuess, *indices = [int(x) for x in line.split()]
+                cache[indicesToBitset(indices, numSolutions)] = (value, exact == 1, bestGuess)
+        print(f'imported {len(cache)} subgames', flush=True)
+    return cache
+
+def optimalSolve(firstGuess=FIRST_GUESS, topK=OPTIMAL_TOP_K, nodeBudget=None, timeBudget=None):
+    """Driver for the exact solver: find the minimum expected number of guesses to solve every
+    answer after opening with firstGuess, considering the topK best bounded guesses at each node.
+    The transposition cache is checkpointed to file after every first guess bucket, when the
+    node or time (sec) budget runs out and on KeyboardInterrupt, and a later call resumes from it.
+    The cached values depend on topK and the word lists, so a checkpoint built with other ones is discarded.
+    Returns the expected number of guesses, or None if the budget ran out"""
+    allWordsList = loadWordList(ALL_WORDS_FILE)
+    solutionWordsList = loadWordList(SOLUTION_WORDS_FILE)
+    patternMatrix = makePatternMatrix(solutionWordsList, allWordsList)
+    settings = {'topK': topK, 'fingerprint': wordListFingerprint(solutionWordsList, allWordsList)}
+    
+    startTime = timeit.default_timer()
+    solverState = {
+        'patternMatrix': patternMatrix,
+        'allGreenPattern': allGreenPattern(len(allWordsList[0])),
+        'cache': importOptimalCheckpoint(settings, len(solutionWordsList)),
+        'topK': topK,
+        'nodes': 0,
+        'nodeBudget': nodeBudget if nodeBudget is not None else float('inf'),
+        'deadline': startTime + timeBudget if timeBudget is not None else float('inf'),
+        'startTime': startTime,
+    }
+    
+    firstGuessIndex = allWordsList.index(firstGuess)
+    allSolutionIndices = np.arange(len(solutionWordsList))
+    buckets = splitByPattern(patternMatrix, firstGuessIndex, allSolutionIndices, solverState['allGreenPattern'])
+    
+    print(f'Solving {len(buckets)} subgames after {firstGuess} exactly (top {topK} guesses per node)...', flush=True)
+    total = len(solutionWordsList)
+    try:
+        for i, bucket in enumerate(buckets):
+            total += solveOptimalSubgame(bucket, float('inf'), solverState)
+            saveOptimalCheckpoint(solverState['cache'], settings, len(solutionWordsList))
+            print(f'{i+1}/{len(buckets)} subgames solved, {solverState["nodes"]} nodes searched', flush=True)
+    except SolverBudgetExceeded:
+        saveOptimalCheckpoint(solverState['cache'], settings, len(solutionWordsList))
+        print(f'Budget exceeded after {solverState["nodes"]} nodes, saved {len(solverState["cache"])} subgames to checkpoint', flush=True)
+        return None
+    except KeyboardInterrupt:
+        # every cache entry is complete, so whatever was solved so far can be resumed
+        saveOptimalCheckpoint(solverState['cache'], settings, len(solutionWordsList))
+        print(f'\nInterrupted after {solverState["nodes"]} nodes, saved {len(solverState["cache"])} subgames to checkpoint', flush=True)
+        raise
+    
+    expectedGuesses = total / len(solutionWordsList)
+    formattedExpected = "{:.4f}".format(expectedGuesses)
+    formatted_time = "{:.2f}".format(timeit.default_timer() - startTime)
+    print(f"\nThe optimal strategy after {firstGuess} uses an average of {formattedExpected} guesses ({formatted_time} sec)")
+    return expectedGuesses
+
+class HardModeIndex:
+    """Precomputed bitsets over allWordsList for finding the guesses real Wordle hard mode allows:
+    positionMasks[pos][letter] holds the words with letter at pos, and
+    countMasks[letter][k] the words containing letter at least k times"""
+    
+    def __init__(self, allWordsList):
+        codes = encodeWords(allWordsList) - ord('a')
+        self.numWords, self.wordLength = codes.shape
+        self.positionMasks = [[indicesToBitset(np.flatnonzero(codes[:, pos] == letter), self.numWords) for letter in range(26)] for pos in range(self.wordLength)]
+        letterCounts = np.stack([np.count_nonzero(codes == letter, axis=1) for letter in range(26)])
+        self.countMasks = [[indicesToBitset(np.flatnonzero(letterCounts[letter] >= k), self.numWords) for k in range(self.wordLength + 1)] for letter in range(26)]
+        self.legalCache = dict()
+    
+    def emptyConstraints(self):
+        """(green letter or -1 per position, min count per letter) before any guess"""
+        return (tuple([-1] * self.wordLength), tuple([0] * 26))
+    
+    def updateConstraints(self, constraints, guessWord, pattern):
+        """Add the hints revealed by guessWord getting pattern: every green stays in place
+        and every green or yellow letter has to be reused at least as many times"""
+        greens, minCounts = list(constraints[0]), list(constraints[1])
+        revealed = [0] * 26
+        for pos, color in enumerate(decodePattern(pattern, self.wordLength)):
+            letter = ord(guessWord[pos]) - ord('a')
+            if color == 2:
+                greens[pos] = letter
+            if color > 0:
+                revealed[letter] += 1
+        return (tuple(greens), tuple(max(a, b) for a, b in zip(minCounts, revealed)))
+    
+    def legalGuesses(self, constraints):
+        """Sorted indices of the words that satisfy the constraints, one AND per hint"""
+        if constraints not in self.legalCache:
+            bits = fullBitset(self.numWords)
+            greens, minCounts = constraints
+            for pos, letter in enumerate(greens):
+                if letter >= 0:
+                    bits &= self.positionMasks[pos][letter]
+            for letter, count in enumerate(minCounts):
+                if count > 0:
+                    bits &= self.countMasks[letter][count]
+            self.legalCache[constraints] = bitsetToIndices(bits, self.numWords)
+        return self.legalCache[constraints]
+
+def hardModeMain():
+    """Driver to simulate solving all possible answers under real Wordle hard mode rules,
+    first guessing 'roate' then only making guesses that reuse every revealed hint.
+    Uses the makeBestGuess policy restricted to the legal guesses. The guess estimation
+    evidence from normal play is used but not updated"""
+    allWordsList = loadWordList(ALL_WORDS_FILE)
+    solutionWordsList = loadWordList(SOLUTION_WORDS_FILE)
+    patternMatrix = makePatternMatrix(solutionWordsList, allWordsList)
+    guessEstArray = importGuessEstimationArray(len(solutionWordsList) + 1)
+    
+    startTime = timeit.default_timer()
+    hardModeIndex = HardModeIndex(allWordsList)
+    patternMasks = getPatternMasks(patternMatrix)
+    numSolutions = len(solutionWordsList)
+    firstGuessIndex = allWordsList.index(FIRST_GUESS)
+    
+    # the guess only depends on the remaining solutions and the hints revealed so far
+    guessCache = dict()
+    guessCounts = list()
+    for ansIndex in range(numSolutions):
+        bits = fullBitset(numSolutions)
+        constraints = hardModeIndex.emptyConstraints()
+        guessIndex = firstGuessIndex
+        guesses = [guessIndex]
+        while guessIndex != ansIndex:
+            pattern = int(patternMatrix[guessIndex, ansIndex])
+            bits &= patternMasks.mask(guessIndex, pattern)
+            constraints = hardModeIndex.updateConstraints(constraints, allWordsList[guessIndex], pattern)
+            key = (bits, constraints)
+            if key not in guessCache:
+                candidates = bitsetToIndices(bits, numSolutions)
+                guessCache[key] = chooseGuess(candidates, patternMatrix, guessEstArray, hardModeIndex.legalGuesses(constraints))
+            guessIndex = guessCache[key]
+            guesses.append(guessIndex)
+        
+        print(f"{ansIndex+1}/{numSolutions} {allWordsList[ansIndex]}: " + ' '.join(allWordsList[g] for g in guesses), flush=True)
+        guessCounts.append(len(guesses))
+    
+    formattedAvgGuesses = "{:.4f}".format(sum(guessCounts) / numSolutions)
+    formatted_time = "{:.2f}".format(timeit.default_timer() - startTime)
+    numFailed = sum(1 for count in guessCounts if count > MAX_GUESSES)
+    print(f"\nUnder real hard mode rules this strategy uses an average of {formattedAvgGuesses} guesses, at most {max(guessCounts)}, {numFailed} games over {MAX_GUESSES} guesses ({formatted_time} sec)")
+    return guessCounts
+
+def scoreMultiBoardGuesses(patternMatrix, boardCandidates, chunkSize=None):
+    """Score every guess against several boards in one vectorized pass.
+    The candidate columns of all boards are gathered together and each board's patterns are
+    offset into their own range, so a single patternHistogram counts the buckets of every board.
+    Returns an array where [guessIndex] is the sum over boards of the avg remaining set size"""
+    columns = np.concatenate([np.asarray(candidates) for candidates in boardCandidates])
+    boardOfColumn = np.repeat(np.arange(len(boardCandidates)), [len(candidates) for candidates in boardCandidates])
+    boardSizes = np.array([len(candidates) for candidates in boardCandidates])
+    scores = np.empty(len(patternMatrix))
+    if chunkSize is None:
+        chunkSize = analysisChunkSize(len(boardCandidates) * matrixPatternCount(patternMatrix), len(columns))
+    for start in range(0, len(patternMatrix), chunkSize):
+        end = min(start + chunkSize, len(patternMatrix))
+        rows = patternMatrix[start:end, columns].astype(np.int64)
+        numPatterns = int(rows.max()) + 1
+        histogram = patternHistogram(rows + boardOfColumn * numPatterns, len(boardCandidates) * numPatterns)
+        numBuckets = np.count_nonzero(histogram.reshape(end - start, len(boardCandidates), numPatterns), axis=2)
+        scores[start:end] = (boardSizes / numBuckets).sum(axis=1)
+    if instrumentation['enabled']:
+        instrumentation['scoringEvaluations'] += len(patternMatrix) * len(columns)
+    return scores
+
+def chooseMultiBoardGuess(boardCandidates, patternMatrix):
+    """Return the index of the guess to make given the candidates of every unsolved board"""
+    # a board down to one solution is solved for free by guessing it
+    for candidates in boardCandidates:
+        if len(candidates) == 1:
+            return int(candidates[0])
+    
+    scores = scoreMultiBoardGuesses(patternMatrix, boardCandidates)
+    
+    # among equally good guesses prefer one that might solve a board this turn
+    isCandidate = np.zeros(len(patternMatrix), dtype=bool)
+    for candidates in boardCandidates:
+        isCandidate[candidates] = True
+    return int(np.lexsort((~isCandidate, scores))[0])
+
+def playMultiBoardGame(answerIndices, firstGuessIndex, patternMatrix, guessCache):
+    """Play one multi board game where every guess is scored against all the answers at once,
+    until each board's answer has been guessed. Returns the list of guess indices.
+    guessCache maps the candidate bitsets of the unsolved boards to the guess made"""
+    numSolutions = patternMatrix.shape[1]
+    patternMasks = getPatternMasks(patternMatrix)
+    boards = {int(answer): fullBitset(numSolutions) for answer in answerIndices}
+    guessIndex = firstGuessIndex
+    guesses = []
+    while True:
+        guesses.append(guessIndex)
+        boards.pop(guessIndex, None)
+        for answer in boards:
+            boards[answer] &= patternMasks.mask(guessIndex, int(patternMatrix[guessIndex, answer]))
+        if len(boards) == 0:
+            return guesses
+        
+        # the guess only depends on the candidate sets, not on which board holds which
+        key = tuple(sorted(boards.values()))
+        if key not in guessCache:
+            guessCache[key] = chooseMultiBoardGuess([bitsetToIndices(bits, numSolutions) for bits in key], patternMatrix)
+        guessIndex = guessCache[key]
+
+def multiBoardMain(numBoards=4, numSamples=MULTI_BOARD_SAMPLES, seed=0):
+    """Driver to simulate Dordle/Quordle style games, where every guess is played on numBoards
+    boards with different answers. Plays numSamples random answer tuples, first guessing 'roate',
+    and reports the average and worst case number of guesses to solve every board"""
+    allWordsList = loadWordList(ALL_WORDS_FILE)
+    solutionWordsList = loadWordList(SOLUTION_WORDS_FILE)
+    patternMatrix = makePatternMatrix(solutionWordsList, allWordsList)
+    
+    startTime = timeit.default_timer()
+    rng = np.random.default_rng(seed)
+    firstGuessIndex = allWordsList.index(FIRST_GUESS)
+    guessLimit = MULTI_BOARD_GUESS_LIMITS.get(numBoards, numBoards + 5)
+    
+    guessCache = dict()
+    guessCounts = list()
+    worstAnswers = None
+    for game in range(numSamples):
+        answerIndices = rng.choice(len(solutionWordsList), numBoards, replace=False)
+        guesses = playMultiBoardGame(answerIndices, firstGuessIndex, patternMatrix, guessCache)
+        if len(guessCounts) == 0 or len(guesses) > max(guessCounts):
+            worstAnswers = answerIndices
+        guessCounts.append(len(guesses))
         
+        answers = ','.join(allWordsList[a] for a in answerIndices)
+        print(f"{game+1}/{numSamples} {answers}: " + ' '.join(allWordsList[g] for g in guesses), flush=True)
+    
+    formattedAvgGuesses = "{:.4f}".format(sum(guessCounts) / numSamples)
+    formatted_time = "{:.2f}".format(timeit.default_timer() - startTime)
+    numFailed = sum(1 for count in guessCounts if count > guessLimit)
+    worst = ','.join(allWordsList[a] for a in worstAnswers)
+    print(f"\nOn {numBoards} boards this strategy uses an average of {formattedAvgGuesses} guesses, at most {max(guessCounts)} ({worst}), {numFailed} games over {guessLimit} guesses ({formatted_time} sec)")
+    return guessCounts
+
+def simulateAllAnswers(firstGuessIndex, patternMatrix, guessEstArray, allWordsList, numSolutions, checkpointInterval=None):
+    """Solve every answer by replaying its path through the strategy tree.
+    Each answer's evidence is added to guessEstArray right away, so later guesses learn from it.
+    If checkpointInterval is given, the guess estimation evidence is saved every that many answers.
+    Returns (number of guesses per answer, root of the strategy tree)"""
+    strategyCache = dict()
+    root = makeStrategyNode(firstGuessIndex, fullBitset(numSolutions), 0, numSolutions)
+    
+    guessCounts = list()
+    for ansIndex in range(numSolutions):
+        # print updates        
+        print(f"{ansIndex+1}/{numSolutions} {allWordsList[ansIndex]}: ", end='')
+        
+        # determine number of guesses by following the strategy tree, guessing 'roate' first
+        numGuesses = replayStrategyTree(ansIndex, root, patternMatrix, guessEstArray, allWordsList, strategyCache)
+        guessCounts.append(numGuesses)
+
+        # flush recursive print statements      
+        print(flush=True)
+        
+        if checkpointInterval is not None and (ansIndex + 1) % checkpointInterval == 0:
+            saveGuessEstimationArray(guessEstArray)
+    return guessCounts, root
+
 def main():
     """Driver to simulate solving all possible answers by first guessing 'roate'
-    then using the best guessing strategy to minimize total guesses
+    then using the best guessing strategy to minimize total guesses.
+    The strategy is built as a tree once, every answer replays its path through it
     """
     # load word lists from file
     allWordsList = loadWordList(ALL_WORDS_FILE)
     solutionWordsList = loadWordList(SOLUTION_WORDS_FILE)
-    print(f"{len(allWordsList)} 5-letter words in dictionary", flush=True)
+    print(f"{len(allWordsList)} {len(allWordsList[0])}-letter words in dictionary", flush=True)
     print(f"{len(solutionWordsList)} of those are possible solutions\n", flush=True)
     
     # use word lists to create pattern matrix and pattern frequency matrix
@@ -417,32 +1398,759 @@ def main():
     # always guess 'roate' first
     firstGuessIndex = allWordsList.index(FIRST_GUESS)
     
-    guessesSum = 0
-    for ansIndex in range(len(solutionWordsList)):
-        # guess 'roate' first and determine the list of remaining words
-        myPossibleSolutionIndices = list()
-        for i in range(len(solutionWordsList)):
-            if patternMatrix[firstGuessIndex][i] == patternMatrix[firstGuessIndex][ansIndex]:
-                myPossibleSolutionIndices.append(i)
-                
-        # print updates        
-        print(f"{ansIndex+1}/{len(solutionWordsList)} {allWordsList[ansIndex]}: {allWordsList[firstGuessIndex]} ", end='')
-        
-        # determine number of guesses using the implemented strategy
-        numGuesses = 1 + makeBestGuess(ansIndex, myPossibleSolutionIndices, patternMatrix, guessEstArray, allWordsList)
-        guessesSum += numGuesses
-
-        # flush recursive print statements      
-        print(flush=True)
+    guessCounts, root = simulateAllAnswers(firstGuessIndex, patternMatrix, guessEstArray, allWordsList, len(solutionWordsList), GUESS_ESTIMATION_CHECKPOINT_INTERVAL)
         
     # save guess estimation array to improve future guesses based on remaining possible solutions
     saveGuessEstimationArray(guessEstArray)
+    exportStrategyTree(root, allWordsList)
         
-    totalAvgGuesses = guessesSum / len(solutionWordsList) 
+    totalAvgGuesses = sum(guessCounts) / len(solutionWordsList) 
     formattedAvgGuesses = "{:.4f}".format(totalAvgGuesses)
     print(f"\nThis strategy uses an average of {formattedAvgGuesses} guesses")
 
+def compareHeuristics(heuristics=None):
+    """Driver to run the full simulation of main() once per guess scoring heuristic (all of
+    GUESS_HEURISTICS by default) and compare their average guesses, failure rate (games over
+    MAX_GUESSES guesses) and wall clock time. Every run starts from the same guess estimation
+    evidence, and nothing is saved"""
+    allWordsList = loadWordList(ALL_WORDS_FILE)
+    solutionWordsList = loadWordList(SOLUTION_WORDS_FILE)
+    patternMatrix = makePatternMatrix(solutionWordsList, allWordsList)
+    guessEstArray = importGuessEstimationArray(len(solutionWordsList) + 1)
+    firstGuessIndex = allWordsList.index(FIRST_GUESS)
+    numSolutions = len(solutionWordsList)
+    
+    report = list()
+    for heuristic in heuristics or list(GUESS_HEURISTICS):
+        print(f'Simulating all answers with the {heuristic} heuristic...', end='', flush=True)
+        startTime = timeit.default_timer()
+        strategyCache = dict()
+        root = makeStrategyNode(firstGuessIndex, fullBitset(numSolutions), 0, numSolutions)
+        runEstArray = guessEstArray.copy()
+        with contextlib.redirect_stdout(io.StringIO()):
+            guessCounts = [replayStrategyTree(ansIndex, root, patternMatrix, runEstArray, allWordsList, strategyCache, heuristic) for ansIndex in range(numSolutions)]
+        elapsedTime = timeit.default_timer() - startTime
+        
+        result = {'heuristic': heuristic, 'avgGuesses': sum(guessCounts) / numSolutions, 'maxGuesses': max(guessCounts),
+                  'failureRate': sum(1 for count in guessCounts if count > MAX_GUESSES) / numSolutions, 'sec': elapsedTime}
+        report.append(result)
+        print(f"{result['avgGuesses']:.4f} guesses in {elapsedTime:.2f} sec", flush=True)
+    
+    print("\nHEURISTIC COMPARISON")
+    for rank, result in enumerate(sorted(report, key=lambda result: result['avgGuesses'])):
+        print(f"{rank+1}. {result['heuristic']}: avg {result['avgGuesses']:.4f} guesses, at most {result['maxGuesses']}, {100*result['failureRate']:.2f}% over {MAX_GUESSES} guesses, {result['sec']:.2f} sec")
+    return report
+
+def parseFeedback(feedback, wordLength=None):
+    """Convert feedback such as '02110' (0=gray, 1=yellow, 2=green) or 'bgyyb' (b/x/- = gray,
+    y = yellow, g = green) into a pattern score.
+    Raises ValueError if it is not wordLength colors long (when given) or has an unknown color"""
+    if wordLength is not None and len(feedback) != wordLength:
+        raise ValueError(f"feedback '{feedback}' has {len(feedback)} colors, expected {wordLength}")
+    colors = {'0': 0, 'b': 0, 'x': 0, '-': 0, '1': 1, 'y': 1, '2': 2, 'g': 2}
+    if any(c not in colors for c in feedback.lower()):
+        raise ValueError(f"feedback '{feedback}' has an unknown color")
+    return patternScore([colors[c] for c in feedback.lower()])
+
+class ResidentSolver:
+    """Long lived solver that loads the word lists, pattern matrix and guess estimation array once
+    and answers 'given these guesses and feedback, what next?' queries with the makeBestGuess policy"""
+    
+    def __init__(self):
+        self.allWordsList = loadWordList(ALL_WORDS_FILE)
+        self.solutionWordsList = loadWordList(SOLUTION_WORDS_FILE)
+        self.patternMatrix = makePatternMatrix(self.solutionWordsList, self.allWordsList)
+        self.guessEstArray = importGuessEstimationArray(len(self.solutionWordsList) + 1)
+        self.wordIndices = {word: i for i, word in enumerate(self.allWordsList)}
+        self.allSolutionIndices = np.arange(len(self.solutionWordsList))
+        self.guessCache = dict()
+        self.latencies = collections.deque(maxlen=LATENCY_WINDOW)
+        self.numQueries = 0
+    
+    def patternRow(self, guess):
+        """Patterns of guess against every solution, computed on the fly for words outside the dictionary.
+        Raises ValueError if guess is not a word of the dictionary's length"""
+        if guess in self.wordIndices:
+            return self.patternMatrix[self.wordIndices[guess]]
+        wordLength = len(self.allWordsList[0])
+        if len(guess) != wordLength or not guess.isascii() or not guess.isalpha():
+            raise ValueError(f"guess '{guess}' is not a {wordLength}-letter word")
+        return computePatternBlock(encodeWords([guess]), encodeWords(self.solutionWordsList))[0]
+    
+    def guessPattern(self, guess, feedback):
+        """(pattern row of guess, pattern score of feedback) for one step of a game history.
+        Raises ValueError if the guess or feedback length does not match the dictionary's word length"""
+        row = self.patternRow(guess.lower())
+        return row, parseFeedback(feedback, len(guess))
+    
+    def possibleSolutions(self, history):
+        """Narrow down the possible solutions given a list of (guess, feedback) pairs"""
+        candidates = self.allSolutionIndices
+        for guess, feedback in history:
+            row, pattern = self.guessPattern(guess, feedback)
+            candidates = candidates[row[candidates] == pattern]
+        return candidates
+    
+    def nextGuess(self, history):
+        """Return (next guess word, number of possible solutions) given a list of (guess, feedback) pairs.
+        The guess is None if the feedback is inconsistent with every solution"""
+        startTime = timeit.default_timer()
+        
+        if len(history) == 0:
+            guess, numRemaining = FIRST_GUESS, len(self.solutionWordsList)
+        else:
+            candidates = self.possibleSolutions(history)
+            numRemaining = len(candidates)
+            guess = None
+            if numRemaining > 0:
+                guess = self.allWordsList[self.recommend(candidates)]
+        
+        self.latencies.append(timeit.default_timer() - startTime)
+        self.numQueries += 1
+        return guess, numRemaining
+    
+    def recommend(self, candidates):
+        """Index of the guess the makeBestGuess policy makes for a non-empty set of candidates.
+        Memoized per candidate set bitset, the cache is cleared once it holds GUESS_CACHE_SIZE sets"""
+        key = indicesToBitset(candidates, len(self.solutionWordsList))
+        if key not in self.guessCache:
+            if len(self.guessCache) >= GUESS_CACHE_SIZE:
+                self.guessCache.clear()
+            self.guessCache[key] = chooseGuess(candidates, self.patternMatrix, self.guessEstArray)
+        return self.guessCache[key]
+    
+    def latencyStats(self):
+        """p50 and p99 query latency in ms over the last LATENCY_WINDOW queries"""
+        if len(self.latencies) == 0:
+            return {'queries': 0, 'p50Ms': 0.0, 'p99Ms': 0.0}
+        p50, p99 = np.percentile(np.array(self.latencies) * 1000, [50, 99])
+        return {'queries': self.numQueries, 'p50Ms': round(float(p50), 3), 'p99Ms': round(float(p99), 3)}
+
+def parseHistory(text):
+    """Parse 'roate:00120 clasp:bgyyb' (or comma separated) into [(guess, feedback), ...]"""
+    return [tuple(item.split(':')) for item in text.replace(',', ' ').split()]
+
+def serveSolverStdin(solver=None):
+    """Line protocol on stdin/stdout. Each line is a history such as 'roate:00120 clasp:02001'
+    (an empty line means no guesses yet) and is answered with 'nextGuess numRemaining'.
+    'stats' prints the latency counters, 'quit' exits"""
+    if solver is None:
+        solver = ResidentSolver()
+    print('ready', flush=True)
+    for line in sys.stdin:
+        line = line.strip()
+        if line == 'quit':
+            break
+        if line == 'stats':
+            print(json.dumps(solver.latencyStats()), flush=True)
+            continue
+        try:
+            guess, numRemaining = solver.nextGuess(parseHistory(line))
+            print(f'{guess} {numRemaining}', flush=True)
+        except (KeyError, ValueError, IndexError) as e:
+            print(f'error {e!r}', flush=True)
+
+def readGameLog(file):
+    """Lazily yield (line number, line) for each game in a log file ('-' for stdin),
+    skipping blank lines and # comments"""
+    f = sys.stdin if file == '-' else open(file, 'r')
+    try:
+        for lineNumber, line in enumerate(f, 1):
+            line = line.strip()
+            if line and not line.startswith('#'):
+                yield lineNumber, line
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+def evaluateGame(solver, history):
+    """Yield one result per state of a played game: after each guess, the number of solutions
+    that are still possible and the solver's recommended next move (None once solved).
+    Candidates are narrowed with pattern matrix lookups, carried over from state to state"""
+    candidates = solver.allSolutionIndices
+    for turn, (guess, feedback) in enumerate(history, 1):
+        row, pattern = solver.guessPattern(guess, feedback)
+        candidates = candidates[row[candidates] == pattern]
+        
+        recommended = None
+        if pattern != allGreenPattern(len(guess)) and len(candidates) > 0:
+            recommended = solver.allWordsList[solver.recommend(candidates)]
+        yield {'turn': turn, 'guess': guess, 'feedback': feedback, 'remaining': len(candidates), 'recommended': recommended}
+
+def evaluateGameLog(inputFile='-', outputFile='-', solver=None):
+    """Replay a log of played games, one per line in the same 'guess:feedback guess:feedback' format
+    the stdin server uses, and write one json line per game state as soon as it is evaluated.
+    Only one game is held in memory at a time. Progress and throughput go to stderr.
+    Returns the number of games evaluated"""
+    if solver is None:
+        solver = ResidentSolver()
+    out = sys.stdout if outputFile == '-' else open(outputFile, 'w')
+    
+    numGames = 0
+    startTime = timeit.default_timer()
+    try:
+        for lineNumber, line in readGameLog(inputFile):
+            try:
+                for state in evaluateGame(solver, parseHistory(line)):
+                    state['game'] = lineNumber
+                    out.write(json.dumps(state) + '\n')
+            except (KeyError, ValueError, IndexError) as e:
+                out.write(json.dumps({'game': lineNumber, 'error': repr(e)}) + '\n')
+            numGames += 1
+            
+            if numGames % GAME_LOG_PROGRESS_INTERVAL == 0:
+                out.flush()
+                elapsedTime = timeit.default_timer() - startTime
+                print(f'{numGames} games evaluated, {numGames/elapsedTime:.1f} games/sec', file=sys.stderr, flush=True)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    
+    elapsedTime = timeit.default_timer() - startTime
+    gamesPerSec = numGames / elapsedTime if elapsedTime > 0 else 0.0
+    print(f'Evaluated {numGames} games in {elapsedTime:.2f} sec ({gamesPerSec:.1f} games/sec)', file=sys.stderr, flush=True)
+    return numGames
+
+class SolverRequestHandler(BaseHTTPRequestHandler):
+    """GET /next?history=roate:00120,clasp:02001 and GET /stats, both answered with json"""
+    solver = None
+    
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path == '/stats':
+            self.sendJson(200, self.solver.latencyStats())
+        elif url.path == '/next':
+            try:
+                history = parseHistory(parse_qs(url.query).get('history', [''])[0])
+                guess, numRemaining = self.solver.nextGuess(history)
+                self.sendJson(200, {'guess': guess, 'remaining': numRemaining})
+            except (KeyError, ValueError, IndexError) as e:
+                self.sendJson(400, {'error': repr(e)})
+        else:
+            self.sendJson(404, {'error': 'unknown path'})
+    
+    def sendJson(self, status, body):
+        data = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+    
+    def log_message(self, format, *args):
+        pass # keep the console quiet, use /stats instead
+
+def serveSolverHttp(port=SERVER_PORT, solver=None):
+    """Serve next guess queries over HTTP on localhost until interrupted"""
+    SolverRequestHandler.solver = solver if solver is not None else ResidentSolver()
+    server = HTTPServer(('127.0.0.1', port), SolverRequestHandler)
+    print(f'Serving next guess queries on http://127.0.0.1:{port}/next?history=roate:00120', flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    server.server_close()
+
+def timeStage(function, repeats=1):
+    """Run function repeats times and return (best wall clock time in sec, result of the last run)"""
+    bestTime = float('inf')
+    for _ in range(repeats):
+        startTime = timeit.default_timer()
+        result = function()
+        bestTime = min(bestTime, timeit.default_timer() - startTime)
+    return bestTime, result
+
+def currentCommit():
+    """Short git commit hash of the working tree, or None outside a git checkout"""
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def runBenchmarks(repeats=1, setSizes=BENCHMARK_SET_SIZES, seed=0):
+    """Time each stage of the solver and write the results as json to BENCHMARK_FILE so runs on
+    different commits can be compared with compareBenchmarks. Nothing else in output/ is modified.
+    The makeBestGuess stages also record the instrumentation counters"""
+    allWordsList = loadWordList(ALL_WORDS_FILE)
+    solutionWordsList = loadWordList(SOLUTION_WORDS_FILE)
+    fingerprint = wordListFingerprint(solutionWordsList, allWordsList)
+    patternMatrix = makePatternMatrix(solutionWordsList, allWordsList)
+    guessEstArray = importGuessEstimationArray(len(solutionWordsList) + 1)
+    stages = dict()
+    
+    def buildPatternMatrix():
+        guessCodes, answerCodes = encodeWords(allWordsList), encodeWords(solutionWordsList)
+        for start in range(0, len(allWordsList), PATTERN_BLOCK_SIZE):
+            computePatternBlock(guessCodes[start:start + PATTERN_BLOCK_SIZE], answerCodes)
+    stages['patternMatrixBuild'] = {'sec': timeStage(buildPatternMatrix, repeats)[0]}
+    
+    def loadPatternMatrix():
+        with contextlib.redirect_stdout(io.StringIO()):
+            matrix = importMatrixBinary(PATTERN_MATRIX_BIN_FILE, fingerprint)
+        return int(np.asarray(matrix).sum(dtype=np.int64)) # touch every page
+    stages['patternMatrixLoad'] = {'sec': timeStage(loadPatternMatrix, repeats)[0]}
+    
+    def buildPatternFreqMatrix():
+        numPatterns = patternCount(len(allWordsList[0]))
+        patternFreqMatrix = np.zeros((len(patternMatrix), numPatterns), dtype=uint16)
+        chunkSize = analysisChunkSize(numPatterns, patternMatrix.shape[1])
+        for start in range(0, len(patternMatrix), chunkSize):
+            patternFreqMatrix[start:start + chunkSize] = patternHistogram(patternMatrix[start:start + chunkSize], numPatterns)
+        return patternFreqMatrix
+    sec, patternFreqMatrix = timeStage(buildPatternFreqMatrix, repeats)
+    stages['patternFreqMatrixBuild'] = {'sec': sec}
+    
+    def firstGuess():
+        with contextlib.redirect_stdout(io.StringIO()):
+            return analyzeGuesses(allWordsList, patternMatrix, patternFreqMatrix)
+    stages['firstGuessAnalysis'] = {'sec': timeStage(firstGuess, repeats)[0]}
+    
+    rng = np.random.default_rng(seed)
+    for size in setSizes:
+        size = min(size, len(solutionWordsList))
+        candidates = sorted(rng.choice(len(solutionWordsList), size=size, replace=False).tolist())
+        answerIndex = candidates[len(candidates) // 2]
+        def bestGuess():
+            with contextlib.redirect_stdout(io.StringIO()):
+                return makeBestGuess(answerIndex, candidates, patternMatrix, guessEstArray.copy(), allWordsList)
+        enableInstrumentation()
+        sec, numGuesses = timeStage(bestGuess, 1)
+        stages[f'makeBestGuess{size}'] = {'sec': sec, 'guesses': numGuesses, **instrumentationReport()}
+        enableInstrumentation(False)
+    
+    def fullSimulation():
+        with contextlib.redirect_stdout(io.StringIO()):
+            return sum(simulateAllAnswers(allWordsList.index(FIRST_GUESS), patternMatrix, guessEstArray.copy(), allWordsList, len(solutionWordsList))[0])
+    sec, guessesSum = timeStage(fullSimulation, repeats)
+    stages['fullSimulation'] = {'sec': sec, 'avgGuesses': guessesSum / len(solutionWordsList)}
+    
+    results = {
+        'commit': currentCommit(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'machine': platform.machine(),
+        'cpus': os.cpu_count(),
+        'stages': stages,
+    }
+    with open(BENCHMARK_FILE, 'w') as file:
+        json.dump(results, file, indent=2)
+    
+    print("\nBENCHMARKS")
+    for name, stage in stages.items():
+        print(f"{name}: {stage['sec']:.3f} sec")
+    return results
+
+def compareBenchmarks(oldFile, newFile):
+    """Print the time ratio new/old for every stage in two benchmark json files"""
+    with open(oldFile) as file:
+        old = json.load(file)
+    with open(newFile) as file:
+        new = json.load(file)
+    print(f"{old['commit']} -> {new['commit']}")
+    for name, stage in new['stages'].items():
+        if name in old['stages']:
+            ratio = stage['sec'] / old['stages'][name]['sec'] if old['stages'][name]['sec'] > 0 else float('inf')
+            print(f"{name}: {old['stages'][name]['sec']:.3f} -> {stage['sec']:.3f} sec ({ratio:.2f}x)")
+
+# per process state for the parallel workers, filled in by the pool initializers
+workerState = dict()
+
+def attachMatrix(file):
+    """Memory map a binary matrix file without any checks or output, so every
+    worker process shares the one copy in the OS page cache"""
+    header, offset = readMatrixHeader(file)
+    return np.memmap(file, dtype=np.dtype(header['dtype']), mode='r', offset=offset, shape=tuple(header['shape']))
+
+def initSimulationWorker(patternMatrixFile, guessEstArray, firstGuessIndex):
+    workerState['patternMatrix'] = attachMatrix(patternMatrixFile)
+    workerState['guessEstArray'] = guessEstArray
+    workerState['firstGuessIndex'] = firstGuessIndex
+
+def simulateAnswers(answerIndices):
+    """Worker: solve each answer with its own strategy tree, choosing guesses from the frozen
+    guessEstArray snapshot. Returns a list of (answerIndex, guess indices) and a store holding
+    the estimation evidence replayStrategyTree would have added"""
+    patternMatrix = workerState['patternMatrix']
+    guessEstArray = workerState['guessEstArray']
+    strategyCache = dict()
+    root = makeStrategyNode(workerState['firstGuessIndex'], fullBitset(patternMatrix.shape[1]), 0, patternMatrix.shape[1])
+    
+    evidence = guessEstArray.emptyCopy()
+    results = list()
+    for answerIndex in answerIndices:
+        path = solveAnswerPath(answerIndex, root, patternMatrix, guessEstArray, strategyCache)
+        recordPathEvidence(path, evidence)
+        results.append((answerIndex, [node['guess'] for node in path]))
+    return results, evidence
+
+def splitAnswersByFirstPattern(patternMatrix, firstGuessIndex, numWorkers):
+    """Group answers by the pattern they give for the first guess, so answers sharing a subtree
+    end up in the same worker, then deal the groups out largest first to balance the load"""
+    firstPatterns = np.asarray(patternMatrix[firstGuessIndex])
+    groups = [np.flatnonzero(firstPatterns == pattern).tolist() for pattern in np.unique(firstPatterns)]
+    groups.sort(key=len, reverse=True)
+    
+    batches = [list() for _ in range(numWorkers)]
+    for group in groups:
+        min(batches, key=len).extend(group)
+    return [batch for batch in batches if len(batch) > 0]
+
+def parallelMain(numWorkers=NUM_WORKERS, verbose=True, saveEstimates=True):
+    """Same simulation as main(), split across numWorkers processes that all memory map the same
+    pattern matrix file. Guesses are chosen from a snapshot of the guess estimation array taken
+    at the start and each worker's evidence is merged (exactly, as sums and counts) afterwards,
+    so the results are identical for any number of workers, including parallelMain(1). main() learns
+    from its own evidence as it goes instead, so its results can differ.
+    Returns (guess counts per answer, elapsed sec)"""
+    # load word lists from file
+    allWordsList = loadWordList(ALL_WORDS_FILE)
+    solutionWordsList = loadWordList(SOLUTION_WORDS_FILE)
+    patternMatrix = makePatternMatrix(solutionWordsList, allWordsList)
+    guessEstArray = importGuessEstimationArray(len(solutionWordsList) + 1)
+    firstGuessIndex = allWordsList.index(FIRST_GUESS)
+    
+    startTime = timeit.default_timer()
+    
+    initArgs = (PATTERN_MATRIX_BIN_FILE, guessEstArray.copy(), firstGuessIndex)
+    batches = splitAnswersByFirstPattern(patternMatrix, firstGuessIndex, numWorkers)
+    if numWorkers == 1:
+        initSimulationWorker(*initArgs)
+        batchResults = [simulateAnswers(batch) for batch in batches]
+    else:
+        with multiprocessing.Pool(numWorkers, initializer=initSimulationWorker, initargs=initArgs) as pool:
+            batchResults = pool.map(simulateAnswers, batches)
+    
+    # merge
+    results = list()
+    for batch, evidence in batchResults:
+        results.extend(batch)
+        guessEstArray.merge(evidence)
+    results.sort(key=lambda result: result[0])
+    guessCounts = list()
+    for answerIndex, guesses in results:
+        if verbose:
+            print(f"{answerIndex+1}/{len(solutionWordsList)} {allWordsList[answerIndex]}: " + ' '.join(allWordsList[g] for g in guesses))
+        guessCounts.append(len(guesses))
+    
+    elapsedTime = timeit.default_timer() - startTime
+    
+    if saveEstimates:
+        saveGuessEstimationArray(guessEstArray)
+    
+    formattedAvgGuesses = "{:.4f}".format(sum(guessCounts) / len(guessCounts))
+    formatted_time = "{:.2f}".format(elapsedTime)
+    print(f"\nThis strategy uses an average of {formattedAvgGuesses} guesses ({numWorkers} workers, {formatted_time} sec)", flush=True)
+    return guessCounts, elapsedTime
+
+def initAnalysisWorker(patternMatrixFile, patternFreqMatrixFile):
+    workerState['patternMatrix'] = attachMatrix(patternMatrixFile)
+    workerState['patternFreqMatrix'] = attachMatrix(patternFreqMatrixFile)
+
+def analyzeGuessChunkWorker(bounds):
+    return analyzeGuessChunk(workerState['patternMatrix'], workerState['patternFreqMatrix'], bounds[0], bounds[1])
+
+def parallelAnalyzeGuesses(patternMatrix, numWorkers=NUM_WORKERS, chunkSize=None):
+    """Same result as analyzeGuesses, with the guess chunks split across numWorkers processes.
+    Expects the pattern and pattern freq matrices to already be saved to their binary files"""
+    numGuesses = len(patternMatrix)
+    if chunkSize is None:
+        chunkSize = analysisChunkSize(readMatrixHeader(PATTERN_FREQ_MATRIX_BIN_FILE)[0]['shape'][1], patternMatrix.shape[1])
+    bounds = [(start, min(start + chunkSize, numGuesses)) for start in range(0, numGuesses, chunkSize)]
+    with multiprocessing.Pool(numWorkers, initializer=initAnalysisWorker, initargs=(PATTERN_MATRIX_BIN_FILE, PATTERN_FREQ_MATRIX_BIN_FILE)) as pool:
+        chunks = pool.map(analyzeGuessChunkWorker, bounds)
+    return np.concatenate(chunks).tolist()
+
+def parallelSpeedupReport(workerCounts=None):
+    """Time the full simulation and the first guess analysis with several worker counts,
+    check the results match the one worker run and print the speedups over the one worker
+    simulation and the serial analyzeGuesses"""
+    if workerCounts is None:
+        workerCounts = sorted({1, max(1, NUM_WORKERS // 2), NUM_WORKERS})
+    
+    # make sure both matrices exist on disk before any worker attaches to them
+    allWordsList = loadWordList(ALL_WORDS_FILE)
+    solutionWordsList = loadWordList(SOLUTION_WORDS_FILE)
+    patternMatrix = makePatternMatrix(solutionWordsList, allWordsList)
+    patternFreqMatrix = makePatternFreqMatrix(patternMatrix, wordListFingerprint(solutionWordsList, allWordsList), patternCount(len(allWordsList[0])))
+    
+    # baseline: the same snapshot rule with one worker, and the serial first guess analysis.
+    # leave the guess estimation file alone so every run starts from the same estimates
+    guessCounts, simTime = parallelMain(1, verbose=False, saveEstimates=False)
+    startTime = timeit.default_timer()
+    remaining = analyzeGuesses(allWordsList, patternMatrix, patternFreqMatrix)
+    baseline = (guessCounts, remaining, simTime, timeit.default_timer() - startTime)
+    
+    report = list()
+    for numWorkers in workerCounts:
+        if numWorkers == 1:
+            guessCounts, remaining, simTime, analysisTime = baseline
+        else:
+            guessCounts, simTime = parallelMain(numWorkers, verbose=False, saveEstimates=False)
+            startTime = timeit.default_timer()
+            remaining = parallelAnalyzeGuesses(patternMatrix, numWorkers)
+            analysisTime = timeit.default_timer() - startTime
+        
+        identical = guessCounts == baseline[0] and remaining == baseline[1]
+        report.append((numWorkers, simTime, baseline[2] / simTime, analysisTime, baseline[3] / analysisTime, identical))
+    
+    print("\nPARALLEL SPEEDUP")
+    for numWorkers, simTime, simSpeedup, analysisTime, analysisSpeedup, identical in report:
+        print(f"{numWorkers} workers: simulation {simTime:.2f} sec ({simSpeedup:.2f}x), first guess analysis {analysisTime:.2f} sec ({analysisSpeedup:.2f}x), identical results: {identical}")
+    return report
+
+def evenSplitBound(sizes, numParts):
+    """Lowest possible sum of squared bucket sizes after buckets of the given sizes are each split
+    into at most numParts pieces, which is reached by splitting them as evenly as possible"""
+    sizes = np.asarray(sizes, dtype=np.int64)
+    parts = np.maximum(np.minimum(sizes, numParts), 1)
+    quotient, remainder = np.divmod(sizes, parts)
+    return remainder*(quotient + 1)**2 + (parts - remainder)*quotient**2
+
+def openerBuckets(patternMatrix, guessIndex):
+    """The answer indices guessIndex sorts the answers into, all green bucket included, largest first"""
+    patterns = np.asarray(patternMatrix[guessIndex])
+    order = np.argsort(patterns, kind='stable')
+    splits = np.flatnonzero(np.diff(patterns[order])) + 1
+    buckets = np.split(order, splits)
+    buckets.sort(key=len, reverse=True)
+    return buckets
+
+def openerNumBuckets():
+    """Number of distinct patterns every guess produces over all answers, from the worker's freq matrix"""
+    if 'numBuckets' not in workerState:
+        workerState['numBuckets'] = np.count_nonzero(workerState['patternFreqMatrix'], axis=1)
+    return workerState['numBuckets']
+
+def splitTotals(patternMatrix, guessIndices, buckets, chunkSize=ANALYSIS_CHUNK_SIZE):
+    """For each guess in guessIndices, the sum of squared sizes of the smaller buckets it splits
+    the given buckets of answers into, i.e. the remaining answers summed over every answer in them.
+    Each row gets a (bucket, pattern) key per answer, the keys are sorted and a run of k equal keys
+    adds 1+3+...+(2k-1) = k^2. Single answer buckets always add 1"""
+    multiBuckets = [bucket for bucket in buckets if len(bucket) > 1]
+    totals = np.full(len(guessIndices), len(buckets) - len(multiBuckets), dtype=np.int64)
+    if len(multiBuckets) == 0 or len(guessIndices) == 0:
+        return totals
+    
+    columns = np.concatenate(multiBuckets)
+    patternBits = 8 * patternMatrix.dtype.itemsize
+    keyDtype = next(d for d in (uint16, np.uint32, np.uint64) if len(multiBuckets) << patternBits <= 2**(8 * np.dtype(d).itemsize))
+    offsets = np.repeat(np.arange(len(multiBuckets), dtype=keyDtype) << keyDtype(patternBits), [len(bucket) for bucket in multiBuckets])
+    positions = np.arange(len(columns), dtype=np.int32)
+    for start in range(0, len(guessIndices), chunkSize):
+        end = min(start + chunkSize, len(guessIndices))
+        keys = patternMatrix[np.ix_(guessIndices[start:end], columns)].astype(keyDtype) + offsets
+        keys.sort(axis=1, kind='stable')
+        newRun = np.ones(keys.shape, dtype=bool)
+        newRun[:, 1:] = keys[:, 1:] != keys[:, :-1]
+        runStart = np.maximum.accumulate(np.where(newRun, positions, 0), axis=1)
+        totals[start:end] += (2*(positions - runStart) + 1).sum(axis=1, dtype=np.int64)
+    return totals
+
+def searchFixedOpener(firstGuessIndex, threshold, topPairs):
+    """Worker: total remaining answers (summed over all answers, like firstGuessAnalysis) for
+    firstGuessIndex followed by every fixed second guess. The first guess's buckets are added in
+    largest first, in OPENER_PRUNE_STAGES stages, and after each stage every second guess whose
+    partial sum plus a lower bound for the buckets left reaches the threshold is dropped.
+    The lower bounds come from the number of patterns each guess produces on its own (evenSplitBound).
+    Returns a list of up to topPairs (total, secondGuessIndex) below the threshold"""
+    patternMatrix = workerState['patternMatrix']
+    patternFreqMatrix = workerState['patternFreqMatrix']
+    numBuckets = openerNumBuckets()
+    buckets = openerBuckets(patternMatrix, firstGuessIndex)
+    sizes = np.array([len(bucket) for bucket in buckets])
+    
+    # boundsLeft[k, j] = lower bound for buckets j.. if the second guess produces k patterns
+    maxBuckets = int(numBuckets.max())
+    perBucket = evenSplitBound(sizes[None, :], np.arange(maxBuckets + 1)[:, None])
+    boundsLeft = np.zeros((maxBuckets + 1, len(buckets) + 1), dtype=np.int64)
+    boundsLeft[:, :-1] = np.cumsum(perBucket[:, ::-1], axis=1)[:, ::-1]
+    
+    # the same bound the other way around, splitting each second guess bucket by the first guess
+    candidates = np.flatnonzero(np.arange(len(patternMatrix)) != firstGuessIndex)
+    reverseBound = evenSplitBound(patternFreqMatrix[candidates], numBuckets[firstGuessIndex]).sum(axis=1)
+    
+    # seed the threshold with the second guesses that are best on their own
+    singleTotals = (np.asarray(patternFreqMatrix[candidates], dtype=np.int64)**2).sum(axis=1)
+    seeds = candidates[np.argsort(singleTotals, kind='stable')[:topPairs]]
+    if len(seeds) == topPairs:
+        threshold = min(threshold, int(splitTotals(patternMatrix, seeds, buckets).max()) + 1)
+    
+    alive = np.maximum(boundsLeft[numBuckets[candidates], 0], reverseBound) < threshold
+    candidates = candidates[alive]
+    totals = np.zeros(len(candidates), dtype=np.int64)
+    
+    # stage ends: the buckets that hold the first 1/OPENER_PRUNE_STAGES, 2/OPENER_PRUNE_STAGES, ... of the answers
+    shares = np.arange(1, OPENER_PRUNE_STAGES + 1) * sizes.sum() / OPENER_PRUNE_STAGES
+    stageEnds = np.unique(np.minimum(np.searchsorted(np.cumsum(sizes), shares) + 1, len(buckets)))
+    stageStart = 0
+    for stageEnd in stageEnds:
+        totals += splitTotals(patternMatrix, candidates, buckets[stageStart:stageEnd])
+        alive = totals + boundsLeft[numBuckets[candidates], stageEnd] < threshold
+        candidates, totals = candidates[alive], totals[alive]
+        stageStart = stageEnd
+    
+    order = np.argsort(totals, kind='stable')[:topPairs]
+    return [(int(totals[i]), int(candidates[i])) for i in order]
+
+def searchAdaptiveOpener(firstGuessIndex, threshold):
+    """Worker: total remaining answers for firstGuessIndex followed by the best second guess for
+    each pattern it can produce. Buckets are solved largest first and the search stops as soon as
+    the partial sum plus the size of every bucket left (the best a second guess could do) reaches
+    the threshold. Returns [(total, -1)], or [] if the first guess was cut off"""
+    patternMatrix = workerState['patternMatrix']
+    allGuesses = np.arange(len(patternMatrix))
+    buckets = openerBuckets(patternMatrix, firstGuessIndex)
+    sizesLeft = np.cumsum([len(bucket) for bucket in buckets][::-1])[::-1].tolist() + [0]
+    total = 0
+    for j, bucket in enumerate(buckets):
+        if len(bucket) <= 2:
+            # guessing one of them always separates a pair
+            total += len(bucket)
+        else:
+            total += int(splitTotals(patternMatrix, allGuesses, [bucket]).min())
+        if total + sizesLeft[j + 1] >= threshold:
+            return []
+    return [(total, -1)]
+
+def searchOpenerWorker(task):
+    firstGuessIndex, adaptive, threshold, topPairs = task
+    if adaptive:
+        return firstGuessIndex, searchAdaptiveOpener(firstGuessIndex, threshold)
+    return firstGuessIndex, searchFixedOpener(firstGuessIndex, threshold, topPairs)
+
+def saveOpenerCheckpoint(settings, searched):
+    """Save the searched first guesses after a json header line with the search settings,
+    one per line: firstGuessIndex total:secondGuessIndex ...
+    (second guess -1 when it adapts to the pattern, nothing if the first guess was cut off)"""
+    file = open(OPENER_CHECKPOINT_FILE + '.tmp', 'w')
+    file.write(json.dumps(settings) + '\n')
+    for firstGuessIndex, results in searched.items():
+        file.write(f"{firstGuessIndex} " + ' '.join(f"{total}:{secondGuessIndex}" for total, secondGuessIndex in results) + '\n')
+    file.close()
+    os.replace(OPENER_CHECKPOINT_FILE + '.tmp', OPENER_CHECKPOINT_FILE)
+
+def importOpenerCheckpoint(settings):
+    """Load the first guesses searched by an earlier run with the same settings (mode, topPairs
+    and word lists), or an empty dict"""
+    searched = dict()
+    if os.path.exists(OPENER_CHECKPOINT_FILE):
+        with open(OPENER_CHECKPOINT_FILE) as file:
+            try:
+                savedSettings = json.loads(file.readline())
+            except ValueError:
+                savedSettings = None
+            if savedSettings != settings:
+                print('Opener checkpoint was built with other settings, starting over', flush=True)
+                return searched
+            for line in file:
+                firstGuessIndex, *results = line.split()
+                searched[int(firstGuessIndex)] = [tuple(int(x) for x in result.split(':')) for result in results]
+        print(f'Resuming opener search with {len(searched)} first guesses already searched', flush=True)
+    return searched
+
+def rankOpeners(searched, topPairs):
+    """Best topPairs (total, firstGuessIndex, secondGuessIndex) found so far. A fixed pair found
+    from both of its words is only listed once"""
+    ranked = dict()
+    for firstGuessIndex, results in searched.items():
+        for total, secondGuessIndex in results:
+            key = (firstGuessIndex, secondGuessIndex) if secondGuessIndex == -1 else tuple(sorted((firstGuessIndex, secondGuessIndex)))
+            ranked[key] = total
+    return sorted((total, first, second) for (first, second), total in ranked.items())[:topPairs]
+
+def openerSearch(adaptive=False, numFirstGuesses=None, topPairs=OPENER_TOP_PAIRS, numWorkers=NUM_WORKERS):
+    """Driver to search for the best two guess opening, by the total remaining answers after both
+    guesses (the firstGuessAnalysis measure one step further). The second guess is either the same
+    for every pattern (fixed) or the best one for each pattern the first guess produces (adaptive).
+    First guesses are searched in order of their single guess result, optionally only the best
+    numFirstGuesses of them, in batches split across numWorkers processes. Each batch is pruned
+    against the topPairs-th best total found so far and checkpointed, a later call resumes from it.
+    Returns the ranked list of (total, firstGuessIndex, secondGuessIndex)"""
+    allWordsList = loadWordList(ALL_WORDS_FILE)
+    solutionWordsList = loadWordList(SOLUTION_WORDS_FILE)
+    patternMatrix = makePatternMatrix(solutionWordsList, allWordsList)
+    patternFreqMatrix = makePatternFreqMatrix(patternMatrix, wordListFingerprint(solutionWordsList, allWordsList), patternCount(len(allWordsList[0])))
+    numSolutions = len(solutionWordsList)
+    
+    # single guess totals order the search and bound what any second guess can achieve
+    initAnalysisWorker(PATTERN_MATRIX_BIN_FILE, PATTERN_FREQ_MATRIX_BIN_FILE)
+    singleTotals = (np.asarray(patternFreqMatrix, dtype=np.int64)**2).sum(axis=1)
+    firstGuesses = np.argsort(singleTotals, kind='stable')
+    if numFirstGuesses is not None:
+        firstGuesses = firstGuesses[:numFirstGuesses]
+    maxBuckets = int(openerNumBuckets().max())
+    
+    settings = {'adaptive': adaptive, 'topPairs': topPairs, 'fingerprint': wordListFingerprint(solutionWordsList, allWordsList)}
+    searched = importOpenerCheckpoint(settings)
+    firstGuesses = [int(g) for g in firstGuesses if int(g) not in searched]
+    
+    print(f"Starting {'adaptive' if adaptive else 'fixed'} two step opener search over {len(firstGuesses)} first guesses...", flush=True)
+    startTime = timeit.default_timer()
+    pool = multiprocessing.Pool(numWorkers, initializer=initAnalysisWorker, initargs=(PATTERN_MATRIX_BIN_FILE, PATTERN_FREQ_MATRIX_BIN_FILE)) if numWorkers > 1 else None
+    numPruned = 0
+    try:
+        for start in range(0, len(firstGuesses), OPENER_BATCH_SIZE):
+            ranked = rankOpeners(searched, topPairs)
+            threshold = ranked[-1][0] if len(ranked) == topPairs else float('inf')
+            
+            # skip first guesses no second guess can rescue
+            tasks = list()
+            for firstGuessIndex in firstGuesses[start:start + OPENER_BATCH_SIZE]:
+                sizes = np.asarray(patternFreqMatrix[firstGuessIndex], dtype=np.int64)
+                if evenSplitBound(sizes[sizes > 0], maxBuckets).sum() >= threshold:
+                    searched[firstGuessIndex] = []
+                    numPruned += 1
+                else:
+                    tasks.append((firstGuessIndex, adaptive, threshold, topPairs))
+            
+            if pool is None:
+                batchResults = [searchOpenerWorker(task) for task in tasks]
+            else:
+                batchResults = pool.map(searchOpenerWorker, tasks)
+            for firstGuessIndex, results in batchResults:
+                searched[firstGuessIndex] = results
+                numPruned += len(results) == 0
+            saveOpenerCheckpoint(settings, searched)
+            
+            #provide intermittent progress updates
+            done = min(start + OPENER_BATCH_SIZE, len(firstGuesses))
+            elapsedTime = timeit.default_timer() - startTime
+            formatted_time = "{:.2f}".format(elapsedTime*(len(firstGuesses)/done) - elapsedTime)
+            print(f"{done}/{len(firstGuesses)} first guesses searched ({numPruned} cut off), ~{formatted_time} sec remaining", flush=True)
+            for total, firstGuessIndex, secondGuessIndex in rankOpeners(searched, 1):
+                bestOpener = allWordsList[firstGuessIndex] + ('' if secondGuessIndex == -1 else ' ' + allWordsList[secondGuessIndex])
+                formattedBest = "{:.2f}".format(total / numSolutions)
+                print(f'{bestOpener} is the best opener so far with {formattedBest} words remaining\n', flush=True)
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+    
+    formatted_time = "{:.2f}".format(timeit.default_timer() - startTime)
+    print(f'Opener search finished in {formatted_time} sec\n', flush=True)
+    
+    ranked = rankOpeners(searched, topPairs)
+    print(f"TOP {len(ranked)} {'ADAPTIVE' if adaptive else 'FIXED'} TWO GUESS OPENERS")
+    for i, (total, firstGuessIndex, secondGuessIndex) in enumerate(ranked):
+        secondGuess = 'best second guess per pattern' if secondGuessIndex == -1 else allWordsList[secondGuessIndex]
+        formattedAvg = "{:.2f}".format(total / numSolutions)
+        pctEliminated = "{:.2f}".format(100*(1 - (total / numSolutions**2)))
+        print(f'{i+1}. {allWordsList[firstGuessIndex]} + {secondGuess} with an avg of {formattedAvg} words remaining ({pctEliminated}% eliminated)')
+    return ranked
+
 if __name__ == "__main__":
     # firstGuessAnalysis()
+    # openerSearch()
+    # parallelMain()
+    # hardModeMain()
+    # multiBoardMain()
+    # compareHeuristics()
+    # optimalSolve()
+    # serveSolverStdin()
+    # serveSolverHttp()
+    # runBenchmarks()
+    # evaluateGameLog(sys.argv[1] if len(sys.argv) > 1 else '-')
+    # parallelSpeedupReport()
     main()
         
\ No newline at end of file